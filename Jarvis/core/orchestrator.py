@@ -61,6 +61,20 @@ class _TagStreamFilter:
         ("[ACTION]", "[/ACTION]"),
         ("[EXEC_CODE]", "[/EXEC_CODE]"),
     ]
+    # Opening tag -> closing tag, and every proper prefix of an opening tag.
+    # Outside a tag the filter is a small DFA: its state is the buffered
+    # prefix, and each character either extends it, completes a tag, or
+    # flushes it as plain text.
+    _CLOSE_FOR = dict(_TAGS)
+    # Closing tags are found with a case-insensitive search on the raw tag
+    # buffer, so match offsets index that buffer directly even when upper()
+    # would change its length (e.g. "ß" -> "SS").
+    _CLOSE_RE_FOR = {
+        open_tag: re.compile(re.escape(close_tag), re.IGNORECASE) for open_tag, close_tag in _TAGS
+    }
+    _OPEN_PREFIXES = frozenset(
+        open_tag[:i] for open_tag, _ in _TAGS for i in range(1, len(open_tag))
+    )
 
     def __init__(self):
         self._buf       = ""   # partial tag detection lookahead buffer
@@ -74,68 +88,61 @@ class _TagStreamFilter:
 
     def feed(self, text: str) -> str:
         """Return the displayable portion of a token (empty when inside a tag block)."""
-        display = ""
-        for ch in text:
-            if not self._in_tag:
-                self._buf += ch
-                
-                # Pre-filter: Check for markdown code block markers starting (e.g. ```)
-                # and strip them if they appear just before or as part of a tag sequence.
-                if "```" in self._buf:
-                    # If we see backticks, we strip them from the display buffer
-                    # to prevent them leaking into the UI while we wait for the tag.
-                    self._buf = self._buf.replace("```", "")
-                    # Also strip common language identifiers that follow
-                    for lang in ["shell", "action", "powershell", "cmd", "python"]:
-                        if self._buf.lower().endswith(lang):
-                            self._buf = self._buf[:-(len(lang))]
-                            break
-
-                # Check for any opening tag (case-insensitive)
-                matched = False
-                buf_upper = self._buf.upper()
-                for open_tag, close_tag in self._TAGS:
-                    if open_tag in buf_upper:
-                        idx = buf_upper.index(open_tag)
-                        display += self._buf[:idx]
-                        self._buf = ""
-                        self._in_tag = True
-                        self._tag_type = open_tag
-                        self._close_tag = close_tag
-                        matched = True
-                        break
-                if matched:
+        display = []
+        i, n = 0, len(text)
+        while i < n:
+            if self._in_tag:
+                # Append the rest of the token and look for the closing tag,
+                # starting where a match straddling the old tail could begin.
+                start = max(0, len(self._tag_buf) - len(self._close_tag) + 1)
+                self._tag_buf += text[i:]
+                i = n
+                match = self._CLOSE_RE_FOR[self._tag_type].search(self._tag_buf, start)
+                if match is None:
                     continue
-                # Check if buffer could still be a partial tag prefix
-                could_be_prefix = any(
-                    tag.startswith(buf_upper) for tag, _ in self._TAGS
-                )
-                if not could_be_prefix:
-                    display += self._buf
-                    self._buf = ""
+                # Characters after the closing tag go back through the loop
+                i -= len(self._tag_buf) - match.end()
+                self._end_tag(self._tag_buf[:match.start()])
+            elif not self._buf:
+                # Fast path: plain text up to the next possible tag start
+                j = text.find("[", i)
+                if j < 0:
+                    display.append(text[i:])
+                    break
+                display.append(text[i:j])
+                self._buf = "["
+                i = j + 1
             else:
-                self._tag_buf += ch
-                tag_buf_upper = self._tag_buf.upper()
-                if self._close_tag in tag_buf_upper:
-                    idx = tag_buf_upper.index(self._close_tag)
-                    content = self._tag_buf[:idx].strip()
-                    # Also clean up trailing backticks inside the tag buffer if they exist
-                    content = content.replace("```", "").strip()
-                    if content:
-                        if self._tag_type == "[SHELL]":
-                            self.shell_commands.append(content)
-                        elif self._tag_type == "[ACTION]":
-                            self.action_commands.append(content)
-                        elif self._tag_type == "[EXEC_CODE]":
-                            self.code_commands.append(content)
-                    self._tag_buf = self._tag_buf[idx + len(self._close_tag):]
-                    self._in_tag = False
-                    self._tag_type = None
-                    self._close_tag = None
-                    
-                    # Post-tag: Clean up trailing backticks in the main buffer
-                    self._buf = self._buf.replace("```", "")
-        return display
+                buf = self._buf + text[i]
+                i += 1
+                buf_upper = buf.upper()
+                if buf_upper in self._CLOSE_FOR:
+                    self._buf = ""
+                    self._in_tag = True
+                    self._tag_type = buf_upper
+                    self._close_tag = self._CLOSE_FOR[buf_upper]
+                elif buf_upper in self._OPEN_PREFIXES:
+                    self._buf = buf
+                else:
+                    display.append(buf)
+                    self._buf = ""
+        return "".join(display)
+
+    def _end_tag(self, content: str) -> None:
+        """Store a completed tag's content and return to plain-text state."""
+        # Also clean up backticks inside the tag buffer if they exist
+        content = content.strip().replace("```", "").strip()
+        if content:
+            if self._tag_type == "[SHELL]":
+                self.shell_commands.append(content)
+            elif self._tag_type == "[ACTION]":
+                self.action_commands.append(content)
+            elif self._tag_type == "[EXEC_CODE]":
+                self.code_commands.append(content)
+        self._tag_buf = ""
+        self._in_tag = False
+        self._tag_type = None
+        self._close_tag = None
 
     def flush(self) -> str:
         """Flush any buffered display text at end of stream."""
@@ -9,6 +9,7 @@ Handles both structured [ACTION] tags and legacy [SHELL] tags.
 
 import logging
 import re
+from types import MappingProxyType
 from typing import Optional
 
 from Jarvis.core.system.actions import (
@@ -39,6 +40,47 @@ EXEC_CODE_TAG_PATTERN = re.compile(
     r"(?:```(?:python)?\s*)?\[\s*EXEC_CODE\s*\](.*?)\s*\[\s*/\s*EXEC_CODE\s*\](?:\s*```)?", re.DOTALL | re.IGNORECASE
 )
 
+# All three tag patterns fused into one alternation so extract_actions scans
+# the response once; the named group that matched says which tag it was.
+_ANY_TAG_PATTERN = re.compile(
+    "|".join(
+        pattern.pattern.replace("(.*?)", f"(?P<{name}>.*?)", 1)
+        for name, pattern in (
+            ("action", ACTION_TAG_PATTERN),
+            ("exec_code", EXEC_CODE_TAG_PATTERN),
+            ("shell", SHELL_TAG_PATTERN),
+        )
+    ),
+    re.DOTALL | re.IGNORECASE,
+)
+
+
+# Map [ACTION] verb string to ActionType (built once, not per parsed tag;
+# read-only so no caller can alter the shared table)
+_ACTION_TYPE_MAP = MappingProxyType({
+    "launch_app": ActionType.LAUNCH_APP,
+    "open_app": ActionType.LAUNCH_APP,
+    "open": ActionType.LAUNCH_APP,
+    "open_url": ActionType.OPEN_URL,
+    "url": ActionType.OPEN_URL,
+    "browse": ActionType.OPEN_URL,
+    "new_tab": ActionType.OPEN_URL,   # Alias for opening a URL/browser
+    "search": ActionType.OPEN_URL,    # Redirect to Google search
+    "shell": ActionType.SHELL_COMMAND,
+    "run": ActionType.SHELL_COMMAND,
+    "system_info": ActionType.SYSTEM_INFO,
+    "sysinfo": ActionType.SYSTEM_INFO,
+    "notify": ActionType.NOTIFICATION,
+    "notification": ActionType.NOTIFICATION,
+    "play_music": ActionType.PLAY_MUSIC,
+    "music": ActionType.PLAY_MUSIC,
+    "play": ActionType.PLAY_MUSIC,
+    "exec_code": ActionType.EXEC_CODE,
+    "coding": ActionType.EXEC_CODE,
+    "code_exec": ActionType.EXEC_CODE,
+    "search_system": ActionType.SEARCH_SYSTEM,
+})
+
 
 def parse_action_tag(content: str) -> Optional[ActionRequest]:
     """
@@ -54,41 +96,12 @@ def parse_action_tag(content: str) -> Optional[ActionRequest]:
     if not content:
         return None
 
-    # Check for "type: target" format
-    if ":" in content:
-        parts = content.split(":", 1)
-        action_str = parts[0].strip().lower()
-        target = parts[1].strip()
-    else:
-        action_str = content.strip().lower()
-        target = ""
-
-    # Map string to ActionType
-    type_map = {
-        "launch_app": ActionType.LAUNCH_APP,
-        "open_app": ActionType.LAUNCH_APP,
-        "open": ActionType.LAUNCH_APP,
-        "open_url": ActionType.OPEN_URL,
-        "url": ActionType.OPEN_URL,
-        "browse": ActionType.OPEN_URL,
-        "new_tab": ActionType.OPEN_URL,   # Alias for opening a URL/browser
-        "search": ActionType.OPEN_URL,    # Redirect to Google search
-        "shell": ActionType.SHELL_COMMAND,
-        "run": ActionType.SHELL_COMMAND,
-        "system_info": ActionType.SYSTEM_INFO,
-        "sysinfo": ActionType.SYSTEM_INFO,
-        "notify": ActionType.NOTIFICATION,
-        "notification": ActionType.NOTIFICATION,
-        "play_music": ActionType.PLAY_MUSIC,
-        "music": ActionType.PLAY_MUSIC,
-        "play": ActionType.PLAY_MUSIC,
-        "exec_code": ActionType.EXEC_CODE,
-        "coding": ActionType.EXEC_CODE,
-        "code_exec": ActionType.EXEC_CODE,
-        "search_system": ActionType.SEARCH_SYSTEM,
-    }
-
-    action_type = type_map.get(action_str)
+    # "type: target" or bare "type" — partition yields "" target for the latter
+    verb, _, target = content.partition(":")
+    action_str = verb.strip().lower()
+    target = target.strip()
+
+    action_type = _ACTION_TYPE_MAP.get(action_str)
     if action_type is None:
         logger.warning("Unknown action type: '%s'", action_str)
         return None
@@ -100,10 +113,11 @@ def parse_action_tag(content: str) -> Optional[ActionRequest]:
 
     # Parse args for notification (pipe-separated: title | message)
     args = []
-    if action_type == ActionType.NOTIFICATION and "|" in target:
-        parts = target.split("|", 1)
-        target = parts[0].strip()
-        args = [parts[1].strip()]
+    if action_type == ActionType.NOTIFICATION:
+        title, sep, message = target.partition("|")
+        if sep:
+            target = title.strip()
+            args = [message.strip()]
 
     return ActionRequest(
         action_type=action_type,
@@ -121,30 +135,33 @@ def extract_actions(llm_response: str) -> tuple[list[ActionRequest], list[str]]:
         (action_requests, shell_commands) — both lists may be empty.
     """
     actions = []
+    code_actions = []
     shells = []
 
-    # Parse [ACTION] tags
-    for match in ACTION_TAG_PATTERN.finditer(llm_response):
-        req = parse_action_tag(match.group(1))
-        if req:
-            actions.append(req)
-
-    # Parse [EXEC_CODE] tags
-    for match in EXEC_CODE_TAG_PATTERN.finditer(llm_response):
-        code = match.group(1).strip()
-        if code:
-            actions.append(ActionRequest(
-                action_type=ActionType.EXEC_CODE,
-                target=code,
-                raw_text=f"exec_code: {code[:30]}..."
-            ))
-
-    # Parse [SHELL] tags (legacy compatibility)
-    for match in SHELL_TAG_PATTERN.finditer(llm_response):
-        cmd = match.group(1).strip()
-        if cmd:
-            shells.append(cmd)
-
+    for match in _ANY_TAG_PATTERN.finditer(llm_response):
+        kind = match.lastgroup
+        body = match.group(kind)
+
+        if kind == "action":
+            req = parse_action_tag(body)
+            if req:
+                actions.append(req)
+        elif kind == "exec_code":
+            code = body.strip()
+            if code:
+                code_actions.append(ActionRequest(
+                    action_type=ActionType.EXEC_CODE,
+                    target=code,
+                    raw_text=f"exec_code: {code[:30]}..."
+                ))
+        else:
+            # [SHELL] tags (legacy compatibility)
+            cmd = body.strip()
+            if cmd:
+                shells.append(cmd)
+
+    # [EXEC_CODE] requests follow all [ACTION] requests, as before
+    actions.extend(code_actions)
     return actions, shells
 
 
@@ -10,12 +10,17 @@ import json
 import logging
 import os
 from dataclasses import dataclass, field
-from difflib import get_close_matches
+from difflib import SequenceMatcher, get_close_matches
 from typing import Optional
 
 logger = logging.getLogger("jarvis.app_registry")
 
 
+def _deletes(word: str) -> set[str]:
+    """Return *word* plus every variant of it with one character removed."""
+    return {word, *(word[:i] + word[i + 1:] for i in range(len(word)))}
+
+
 # ─────────────────────── Data Model ─────────────────────────────────────────
 
 @dataclass
@@ -37,12 +42,15 @@ class AppRegistry:
     Resolves application names to launch configurations.
 
     Loads known apps from app_registry.json and builds a lookup
-    table keyed by canonical name + all aliases for fast matching.
+    table keyed by canonical name + all aliases for fast matching,
+    plus a one-deletion index over the same keys for typo lookup.
     """
 
     def __init__(self, registry_path: Optional[str] = None):
         self._apps: dict[str, AppEntry] = {}
         self._alias_map: dict[str, str] = {}  # alias -> canonical name
+        self._typo_index: dict[str, set[str]] = {}  # one-char deletion -> aliases
+        self._aliases_by_len: dict[int, list[str]] = {}
 
         # Default to bundled JSON in same directory
         if registry_path is None:
@@ -81,6 +89,12 @@ class AppRegistry:
                 for alias in app.aliases:
                     self._alias_map[alias.lower()] = key
 
+            # Two strings within one edit share a one-deletion variant
+            for alias in self._alias_map:
+                self._aliases_by_len.setdefault(len(alias), []).append(alias)
+                for variant in _deletes(alias):
+                    self._typo_index.setdefault(variant, set()).add(alias)
+
             logger.info("App registry loaded: %d apps, %d aliases",
                         len(self._apps), len(self._alias_map))
 
@@ -107,9 +121,8 @@ class AppRegistry:
         if q in self._alias_map:
             return self._apps[self._alias_map[q]]
 
-        # 2. Fuzzy match against all aliases
-        all_aliases = list(self._alias_map.keys())
-        matches = get_close_matches(q, all_aliases, n=1, cutoff=0.7)
+        # 2. Fuzzy match against the aliases that could still win
+        matches = get_close_matches(q, self._fuzzy_candidates(q), n=1, cutoff=0.7)
         if matches:
             canonical = self._alias_map[matches[0]]
             logger.info("Fuzzy resolved '%s' → '%s' (via alias '%s')", query, canonical, matches[0])
@@ -119,6 +132,34 @@ class AppRegistry:
         logger.debug("App not in registry: '%s'", query)
         return None
 
+    def _fuzzy_candidates(self, q: str):
+        """
+        Narrow the aliases difflib has to score for *q*.
+
+        Aliases within one edit of *q* come straight from the deletion index.
+        The best of their difflib ratios is a floor for the winner, and an
+        alias of length L can score at most 2*min(len(q), L) / (len(q) + L),
+        so whole length buckets that cannot reach the floor are skipped.
+        Falls back to every alias when nothing is within one edit.
+        """
+        near = set()
+        for variant in _deletes(q):
+            near.update(self._typo_index.get(variant, ()))
+        if not near:
+            return self._alias_map.keys()
+
+        matcher = SequenceMatcher(b=q)
+        floor = 0.0
+        for alias in near:
+            matcher.set_seq1(alias)
+            floor = max(floor, matcher.ratio())
+
+        n = len(q)
+        for length, aliases in self._aliases_by_len.items():
+            if 2 * min(n, length) / (n + length) >= floor:
+                near.update(aliases)
+        return near
+
     def get(self, canonical_name: str) -> Optional[AppEntry]:
         """Get an app by its canonical name."""
         return self._apps.get(canonical_name)
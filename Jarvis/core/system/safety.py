@@ -19,13 +19,23 @@ Tier GREEN (LOW):
     - Matches RiskLevel.LOW.
 """
 
+import functools
 import logging
 import re
+import threading
 from dataclasses import dataclass, field
 from typing import Optional
 
 from Jarvis.core.system.actions import ActionType, RiskLevel
 
+# hyperscan is optional — multi-pattern DFA scan for the risk patterns
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    hyperscan = None
+    HYPERSCAN_AVAILABLE = False
+
 logger = logging.getLogger("jarvis.safety")
 
 
@@ -89,6 +99,65 @@ SENSITIVE_PATHS = [
     r"\\\\.\b",
 ]
 
+# Read-only commands may touch sensitive paths
+_READ_ONLY_RE = re.compile(r"^(get-childitem|ls|dir|type|cat|get-content|test-path)\b")
+
+# Sensitive paths fused into one alternation; the per-path patterns are only
+# walked (for the description) once the fused search has found a hit.
+_SENSITIVE_PATH_RES = [(p, re.compile(p, re.IGNORECASE)) for p in SENSITIVE_PATHS]
+_SENSITIVE_PATHS_RE = re.compile(
+    "|".join(f"(?:{p})" for p in SENSITIVE_PATHS), re.IGNORECASE
+)
+
+
+def _compile_risk_levels(patterns: list[RiskPattern]) -> list[tuple]:
+    """
+    Group risk patterns by level, highest first, as
+    (level, fused alternation, [(compiled pattern, description), ...]).
+
+    One search of the fused regex tells whether any pattern of that level
+    matches; the individual patterns, in list order, then pick the
+    description — the same one the first matching pattern would report.
+    """
+    levels = []
+    for level in (RiskLevel.CRITICAL, RiskLevel.HIGH, RiskLevel.MEDIUM):
+        members = [rp for rp in patterns if rp.risk == level]
+        if not members:
+            continue
+        fused = re.compile("|".join(f"(?:{rp.pattern})" for rp in members), re.IGNORECASE)
+        singles = [(re.compile(rp.pattern, re.IGNORECASE), rp.description) for rp in members]
+        levels.append((level, fused, singles))
+    return levels
+
+
+_RISK_LEVELS = _compile_risk_levels(RISK_PATTERNS)
+
+# Hyperscan database over RISK_PATTERNS (pattern id = list index), compiled on
+# first use. A database's scratch space is not thread-safe, so scans share a lock.
+_hs_database = None
+_hs_lock = threading.Lock()
+
+
+def _risk_database():
+    """Compile every risk pattern into one Hyperscan database (once per process)."""
+    global _hs_database
+    if _hs_database is None:
+        expressions = [rp.pattern.encode("utf-8") for rp in RISK_PATTERNS]
+        db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        db.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions),
+        )
+        _hs_database = db
+    return _hs_database
+
+
+def _on_hs_match(pattern_id, start, end, flags, hits):
+    """Hyperscan match callback: record the pattern id and keep scanning."""
+    hits.append(pattern_id)
+
 
 # ─────────────────────── Safety Engine ──────────────────────────────────────
 
@@ -98,9 +167,31 @@ class SafetyEngine:
     Provides allow/block decisions and audit logging.
     """
 
-    def __init__(self):
+    def __init__(self, safety_backend: str = "re"):
+        """
+        Args:
+            safety_backend: "re" (default) or "hyperscan" to match the risk
+                patterns in one DFA scan; falls back to "re" when the
+                hyperscan package is missing or rejects a pattern.
+        """
+        if safety_backend not in ("re", "hyperscan"):
+            raise ValueError(f"Unknown safety backend: {safety_backend!r}")
+
+        self._hs_db = None
+        if safety_backend == "hyperscan":
+            if not HYPERSCAN_AVAILABLE:
+                logger.warning("hyperscan not installed; using re for risk patterns")
+            else:
+                try:
+                    self._hs_db = _risk_database()
+                except hyperscan.error as e:
+                    logger.warning("hyperscan compile failed (%s); using re for risk patterns", e)
+
         self._blocklist: list[str] = []      # Exact command strings to always block
         self._allowlist: list[str] = []      # Patterns to always allow (override risk)
+        self._allowlist_res: list[re.Pattern] = []  # Compiled allowlist, one per entry
+        # Per-engine memo of assessments; cleared whenever either list changes
+        self._assess_cached = functools.lru_cache(maxsize=4096)(self._assess_uncached)
         self._audit_log: list[dict] = []     # In-memory audit trail
         self._max_audit = 500                # Max entries to keep
         self._execution_timestamps = []      # For rate limiting
@@ -138,37 +229,42 @@ class SafetyEngine:
         Returns:
             (RiskLevel, description of why it was flagged).
         """
+        return self._assess_cached(command)
+
+    def _assess_uncached(self, command: str) -> tuple[RiskLevel, str]:
+        """assess_command without the memo; deterministic for fixed lists."""
         cmd_lower = command.strip().lower()
 
         # 1. Check sensitive paths
-        for path_pat in SENSITIVE_PATHS:
-            if re.search(path_pat, command, re.IGNORECASE):
-                # Reads are generally okay, but modifications are RED (CRITICAL)
-                is_read_only = re.search(r"^(get-childitem|ls|dir|type|cat|get-content|test-path)\b", cmd_lower)
-                if not is_read_only:
-                    return RiskLevel.CRITICAL, f"Sensitive path access: {path_pat}"
+        if _SENSITIVE_PATHS_RE.search(command):
+            # Reads are generally okay, but modifications are RED (CRITICAL)
+            if not _READ_ONLY_RE.search(cmd_lower):
+                for path_pat, path_re in _SENSITIVE_PATH_RES:
+                    if path_re.search(command):
+                        return RiskLevel.CRITICAL, f"Sensitive path access: {path_pat}"
 
         # 2. Check allowlist
-        for pattern in self._allowlist:
-            if re.search(pattern, cmd_lower, re.IGNORECASE):
-                return RiskLevel.LOW, "Allowlisted"
+        # Entries are compiled separately: joining them would break inline
+        # flags and renumber backreferences
+        if any(p.search(cmd_lower) for p in self._allowlist_res):
+            return RiskLevel.LOW, "Allowlisted"
 
         # 3. Check blocklist
         for blocked in self._blocklist:
             if blocked.lower() in cmd_lower:
                 return RiskLevel.CRITICAL, f"Blocklisted: {blocked}"
 
-        # 4. Check risk patterns
-        highest_risk = RiskLevel.LOW
-        highest_desc = "No risk patterns matched"
+        # 4. Check risk patterns, highest level first; one fused search per level
+        if self._hs_db is not None:
+            return self._assess_with_hyperscan(command)
 
-        for rp in RISK_PATTERNS:
-            if re.search(rp.pattern, command, re.IGNORECASE):
-                if self._risk_rank(rp.risk) > self._risk_rank(highest_risk):
-                    highest_risk = rp.risk
-                    highest_desc = rp.description
+        for level, fused, singles in _RISK_LEVELS:
+            if fused.search(command):
+                for pattern_re, description in singles:
+                    if pattern_re.search(command):
+                        return level, description
 
-        return highest_risk, highest_desc
+        return RiskLevel.LOW, "No risk patterns matched"
 
     def is_dangerous(self, command: str) -> bool:
         """Quick check: is this command in the YELLOW or RED tier?"""
@@ -280,13 +376,36 @@ class SafetyEngine:
     def add_to_blocklist(self, command: str) -> None:
         """Add a command string to the permanent blocklist."""
         self._blocklist.append(command)
+        self._assess_cached.cache_clear()
 
     def add_to_allowlist(self, pattern: str) -> None:
-        """Add a regex pattern to the allowlist (overrides risk assessment)."""
+        """
+        Add a regex pattern to the allowlist (overrides risk assessment).
+
+        Raises:
+            re.error: If the pattern does not compile.
+        """
+        compiled = re.compile(pattern, re.IGNORECASE)
         self._allowlist.append(pattern)
+        self._allowlist_res.append(compiled)
+        self._assess_cached.cache_clear()
 
     # ── Internal ────────────────────────────────────────────────────────
 
+    def _assess_with_hyperscan(self, command: str) -> tuple[RiskLevel, str]:
+        """Risk-pattern step of assess_command as a single Hyperscan scan."""
+        hits: list[int] = []
+        with _hs_lock:
+            self._hs_db.scan(
+                command.encode("utf-8"), match_event_handler=_on_hs_match, context=hits
+            )
+        if not hits:
+            return RiskLevel.LOW, "No risk patterns matched"
+
+        # Highest risk wins; ties go to the earliest pattern, as in the re path
+        best = max(hits, key=lambda i: (self._risk_rank(RISK_PATTERNS[i].risk), -i))
+        return RISK_PATTERNS[best].risk, RISK_PATTERNS[best].description
+
     @staticmethod
     def _risk_rank(level: RiskLevel) -> int:
         """Numeric rank for comparison."""
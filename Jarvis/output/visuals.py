@@ -12,7 +12,7 @@ States:
 import math
 import random
 from PyQt6.QtWidgets import QWidget
-from PyQt6.QtGui import QPainter, QColor, QLinearGradient, QPen, QBrush
+from PyQt6.QtGui import QPainter, QPainterPath, QColor, QLinearGradient, QPen, QBrush
 from PyQt6.QtCore import Qt, QTimer, QPointF, QRectF
 
 
@@ -33,6 +33,7 @@ class VoiceWave(QWidget):
 
     NUM_BARS = 32           # Number of waveform bars
     BAR_SPACING_RATIO = 0.5 # Gap between bars as fraction of bar width
+    GLOW_BUCKETS = 16       # Discrete glow-pulse levels cached per state
 
     # Per-state colour palettes  (top, bottom)
     _PALETTES = {
@@ -60,6 +61,8 @@ class VoiceWave(QWidget):
         # Glow pulse
         self._glow_pulse = 0.0
         self._glow_dir = 1
+        # Glow brushes keyed by (state, pulse bucket) — built once, reused per frame
+        self._glow_cache = {}
 
         self.timer = QTimer(self)
         self.timer.timeout.connect(self._tick)
@@ -163,6 +166,21 @@ class VoiceWave(QWidget):
 
     # ── Paint ────────────────────────────────────────────────────────────
 
+    def _glow_brush(self, palette_top):
+        """Return the cached glow brush for the current state and pulse level."""
+        # One bucket per integer alpha of the 20..35 glow ramp, so the cached
+        # brushes reproduce int(20 + 15 * pulse) exactly
+        last = self.GLOW_BUCKETS - 1
+        bucket = max(0, min(last, int(self._glow_pulse * last)))
+        key = (self.state, bucket)
+        brush = self._glow_cache.get(key)
+        if brush is None:
+            glow = QColor(palette_top)
+            glow.setAlpha(20 + bucket)
+            brush = QBrush(glow)
+            self._glow_cache[key] = brush
+        return brush
+
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
@@ -179,6 +197,13 @@ class VoiceWave(QWidget):
         gap_w = bar_w * total_gap_ratio
 
         center_y = h / 2
+        radius = bar_w / 2
+        painter.setPen(Qt.PenStyle.NoPen)
+
+        # All bar glows share one brush, so collect them into a single path
+        # and fill it once instead of issuing a draw call per bar.
+        glow_path = QPainterPath()
+        glow_path.setFillRule(Qt.FillRule.WindingFill)
 
         for i in range(n):
             bar_h = max(3.0, self._heights[i] * h * 0.85)
@@ -194,24 +219,19 @@ class VoiceWave(QWidget):
             grad.setColorAt(0.0, top)
             grad.setColorAt(1.0, bot)
 
-            painter.setPen(Qt.PenStyle.NoPen)
             painter.setBrush(QBrush(grad))
 
             # Rounded capsule shape
-            radius = bar_w / 2
             painter.drawRoundedRect(
                 QRectF(x, y, bar_w, bar_h), radius, radius
             )
 
-            # Subtle glow behind each bar
-            glow_alpha = int(20 + 15 * self._glow_pulse)
-            glow = QColor(palette_top)
-            glow.setAlpha(glow_alpha)
-            painter.setBrush(QBrush(glow))
-            painter.drawRoundedRect(
+            # Subtle glow around each bar
+            glow_path.addRoundedRect(
                 QRectF(x - 1, y - 2, bar_w + 2, bar_h + 4), radius + 1, radius + 1
             )
 
+        painter.fillPath(glow_path, self._glow_brush(palette_top))
         painter.end()
 
 
@@ -11,10 +11,12 @@ Usage:
 import json
 import argparse
 from pathlib import Path
+from typing import Optional
 
 from Jarvis.sft.canonical_prompt import CANONICAL_SYSTEM_PROMPT
+from Jarvis.sft import jsonl_io
 
-def example_to_chat(data: dict, system_prompt: str) -> dict:
+def example_to_chat(data: dict, system_prompt: str, system_message: Optional[dict] = None) -> dict:
     """
     Convert one JSONL example to chat-message format.
 
@@ -24,38 +26,40 @@ def example_to_chat(data: dict, system_prompt: str) -> dict:
             {"role": "user", "content": "..."},
             {"role": "assistant", "content": "..."}
         ]}
+
+    Args:
+        system_message: Optional pre-built system message dict. Batch callers
+            pass one shared dict so it isn't rebuilt for every example.
     """
     # Build the target assistant output
-    parts = []
-    if data.get("assistant_text"):
-        parts.append(data["assistant_text"])
-    for tag in data.get("action_tags", []):
-        parts.append(f"[ACTION]{tag}[/ACTION]")
-    for tag in data.get("shell_tags", []):
-        parts.append(f"[SHELL]{tag}[/SHELL]")
+    parts = [data["assistant_text"]] if data.get("assistant_text") else []
+    parts.extend(f"[ACTION]{tag}[/ACTION]" for tag in data.get("action_tags", ()))
+    parts.extend(f"[SHELL]{tag}[/SHELL]" for tag in data.get("shell_tags", ()))
 
-    assistant_content = "\n".join(parts)
+    if system_message is None:
+        system_message = {"role": "system", "content": system_prompt}
 
-    messages = [
-        {"role": "system", "content": system_prompt},
+    return {"messages": [
+        system_message,
         {"role": "user", "content": data["user_input"]},
-        {"role": "assistant", "content": assistant_content},
-    ]
-
-    return {"messages": messages}
+        {"role": "assistant", "content": "\n".join(parts)},
+    ]}
 
 
 def convert_file(input_path: str, output_path: str, system_prompt: str) -> int:
     """Convert an entire JSONL file to chat format."""
     count = 0
-    with open(input_path, "r", encoding="utf-8") as fin, \
+    # Every output line carries the same system message; build it once.
+    system_message = {"role": "system", "content": system_prompt}
+    # Read raw bytes: blank lines are skipped without a strip() copy and the
+    # parser decodes UTF-8 itself (surrounding whitespace is valid JSON).
+    with open(input_path, "rb") as fin, \
          open(output_path, "w", encoding="utf-8") as fout:
-        for line in fin:
-            line = line.strip()
-            if not line:
+        for raw in fin:
+            if raw.isspace():
                 continue
-            data = json.loads(line)
-            chat = example_to_chat(data, system_prompt)
+            data = jsonl_io.loads(raw)
+            chat = example_to_chat(data, system_prompt, system_message)
             fout.write(json.dumps(chat, ensure_ascii=False) + "\n")
             count += 1
 
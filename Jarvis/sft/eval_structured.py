@@ -15,6 +15,7 @@ Usage:
     python -m Jarvis.sft.eval_structured --data sft/test.jsonl [--predictions sft/preds.jsonl]
 """
 
+import functools
 import json
 import logging
 import re
@@ -23,6 +24,7 @@ import urllib.request
 import urllib.error
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 logger = logging.getLogger("jarvis.eval_structured")
 
@@ -30,14 +32,25 @@ logger = logging.getLogger("jarvis.eval_structured")
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from Jarvis.core.system.action_router import (
-    parse_action_tag,
-    extract_actions,
-    ACTION_TAG_PATTERN,
-    SHELL_TAG_PATTERN,
-)
-from Jarvis.core.system.safety import SafetyEngine
-from Jarvis.core.system.actions import RiskLevel
+if TYPE_CHECKING:
+    from Jarvis.core.system.safety import SafetyEngine
+
+
+@functools.cache
+def _action_router():
+    """
+    Import the runtime tag parsers on first use.
+
+    Importing Jarvis.core.system pulls in every OS backend, so deferring it
+    keeps ``--help`` and argument errors instant.
+    """
+    from Jarvis.core.system import action_router
+    return action_router
+
+
+def _new_safety_engine() -> "SafetyEngine":
+    from Jarvis.core.system.safety import SafetyEngine
+    return SafetyEngine()
 
 
 # ─────────────────────── Metrics ────────────────────────────────────────────
@@ -135,7 +148,7 @@ class EvalMetrics:
 def evaluate_example(
     expected: dict,
     predicted_text: str,
-    safety: SafetyEngine,
+    safety: "SafetyEngine",
     metrics: EvalMetrics,
 ) -> bool:
     """
@@ -152,9 +165,10 @@ def evaluate_example(
     metrics.scenario_counts[scenario] = metrics.scenario_counts.get(scenario, 0) + 1
 
     correct = True
+    router = _action_router()
 
     # Extract tags from prediction
-    pred_actions, pred_shells = extract_actions(predicted_text)
+    pred_actions, pred_shells = router.extract_actions(predicted_text)
     pred_action_strs = [req.raw_text for req in pred_actions]
     pred_shell_strs = pred_shells
 
@@ -190,10 +204,10 @@ def evaluate_example(
             correct = False
 
     # Tag validity check
-    action_matches = ACTION_TAG_PATTERN.findall(predicted_text)
-    shell_matches = SHELL_TAG_PATTERN.findall(predicted_text)
+    action_matches = router.ACTION_TAG_PATTERN.findall(predicted_text)
+    shell_matches = router.SHELL_TAG_PATTERN.findall(predicted_text)
     for tag_content in action_matches:
-        parsed = parse_action_tag(tag_content)
+        parsed = router.parse_action_tag(tag_content)
         if parsed:
             metrics.tags_valid += 1
         else:
@@ -261,7 +275,7 @@ def evaluate_ground_truth(data_path: str) -> EvalMetrics:
     This validates that the dataset + eval pipeline work correctly —
     expected accuracy should be ~100%.
     """
-    safety = SafetyEngine()
+    safety = _new_safety_engine()
     metrics = EvalMetrics()
 
     with open(data_path, "r", encoding="utf-8") as f:
@@ -288,7 +302,7 @@ def evaluate_ground_truth(data_path: str) -> EvalMetrics:
 
 def evaluate_predictions(data_path: str, predictions_path: str) -> EvalMetrics:
     """Evaluate model predictions against ground-truth."""
-    safety = SafetyEngine()
+    safety = _new_safety_engine()
     metrics = EvalMetrics()
 
     # Load predictions indexed by ID
@@ -18,6 +18,7 @@ Quantization Options (defaults to efficient q4_K_M):
 """
 
 import argparse
+import os
 import subprocess
 import sys
 import time
@@ -27,6 +28,12 @@ from Jarvis.sft.canonical_prompt import CANONICAL_SYSTEM_PROMPT
 
 def merge_lora(base_model: str, lora_path: str, output_path: str):
     """Merge LoRA adapters into base model."""
+    # Set before transformers is imported: silence advisory warnings and, when
+    # the base model is already on disk, skip the HF Hub round-trips.
+    os.environ.setdefault("TRANSFORMERS_NO_ADVISORY_WARNINGS", "1")
+    if Path(base_model).is_dir():
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
     try:
         import torch
         from peft import PeftModel
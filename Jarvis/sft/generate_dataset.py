@@ -18,11 +18,18 @@ import os
 import random
 import argparse
 import logging
+from collections import Counter
 from pathlib import Path
 from typing import List, Dict, Set
 
+from Jarvis.sft import jsonl_io
+
 logger = logging.getLogger(__name__)
 
+_SFT_DIR = Path(__file__).resolve().parent
+_REGISTRY_PATH = _SFT_DIR.parent / "core" / "system" / "app_registry.json"
+_SEED_PATH = _SFT_DIR / "seed_dataset.jsonl"
+
 # ─────────────────────── Phrasing Templates ─────────────────────────────────
 
 PERSONA_RESPONSES = [
@@ -162,23 +169,44 @@ RANDOM_NAMES = ["Projects", "Work", "Notes", "Archive", "Data", "Reports", "Logs
 
 def load_app_registry() -> dict:
     """Load the app registry JSON."""
-    registry_path = Path(__file__).parent.parent / "core" / "system" / "app_registry.json"
-    with open(registry_path, "r", encoding="utf-8") as f:
+    with open(_REGISTRY_PATH, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
+def _choice_stream(population: list, batch: int):
+    """
+    Endless stream of random picks from *population*.
+
+    Draws ``batch`` items per ``random.choices`` call so generator loops pay
+    one RNG dispatch per batch instead of one ``random.choice`` per pick.
+    """
+    batch = max(1, batch)
+    while True:
+        yield from random.choices(population, k=batch)
+
+
+# hash(example_id) % 10 -> split: 70% train, 20% val, 10% test
+_SPLIT_BY_BUCKET = ("train",) * 7 + ("val",) * 2 + ("test",)
+
+
+def _id_block(prefix: str, count: int) -> list[tuple[str, str]]:
+    """
+    Pre-format the sequential IDs a generator can hand out, with their splits.
+
+    ``idx`` only advances when an example is accepted, so it never reaches
+    ``count``; one comprehension replaces a format call and an
+    ``assign_split`` call per accepted row.
+    """
+    ids = [f"{prefix}{i:04d}" for i in range(count)]
+    return [(example_id, _SPLIT_BY_BUCKET[hash(example_id) % 10]) for example_id in ids]
+
+
 def assign_split(example_id: str) -> str:
     """
     Deterministically assign train/val/test split based on example ID hash.
     Ensures 70% train, 20% val, 10% test and is reproducible regardless of order.
     """
-    hash_val = hash(example_id) % 10
-    if hash_val < 7:
-        return "train"
-    elif hash_val < 9:
-        return "val"
-    else:
-        return "test"
+    return _SPLIT_BY_BUCKET[hash(example_id) % 10]
 
 
 def expand_templates_with_cartesian(base_templates: list, suffixes: list, max_attempts: int = 100) -> list:
@@ -214,10 +242,18 @@ def generate_app_examples(registry: dict, target_count: int, seen_inputs: set) -
     attempts = 0
     idx = 0
     max_attempts = target_count * 10
+    url_ids = _id_block("gen_url_", target_count)
+    app_ids = _id_block("gen_app_", target_count)
+
+    picks = _choice_stream(app_items, target_count)
+    url_templates = _choice_stream(URL_TEMPLATES, target_count)
+    url_responses = _choice_stream(URL_RESPONSES, target_count)
+    launch_templates = _choice_stream(LAUNCH_TEMPLATES, target_count)
+    launch_responses = _choice_stream(LAUNCH_RESPONSES, target_count)
     
     while len(examples) < target_count and attempts < max_attempts:
         attempts += 1
-        app_key, app_data = random.choice(app_items)
+        app_key, app_data = next(picks)
         display = app_data["display_name"]
         aliases = app_data.get("aliases", [app_key])
         alias = random.choice(aliases)
@@ -225,19 +261,21 @@ def generate_app_examples(registry: dict, target_count: int, seen_inputs: set) -
         target = app_data.get("launch_target", app_key)
 
         if method == "url":
-            template = random.choice(URL_TEMPLATES)
-            user_input = template.format(app=alias)
+            template = next(url_templates)
+            # Templates carry a single literal placeholder and no format specs,
+            # so str.replace skips str.format's parse on every row.
+            user_input = template.replace("{app}", alias)
             if user_input in seen_inputs:
                 continue
             seen_inputs.add(user_input)
-            response = random.choice(URL_RESPONSES)
-            example_id = f"gen_url_{idx:04d}"
+            response = next(url_responses)
+            example_id, split = url_ids[idx]
             examples.append({
                 "id": example_id,
-                "split": assign_split(example_id),
+                "split": split,
                 "scenario": "url_open",
                 "user_input": user_input,
-                "assistant_text": response.format(display=display),
+                "assistant_text": response.replace("{display}", display),
                 "action_tags": [f"open_url: {target}"],
                 "shell_tags": [],
                 "risk_level": "low",
@@ -247,19 +285,19 @@ def generate_app_examples(registry: dict, target_count: int, seen_inputs: set) -
             })
             idx += 1
         else:
-            template = random.choice(LAUNCH_TEMPLATES)
-            user_input = template.format(app=alias)
+            template = next(launch_templates)
+            user_input = template.replace("{app}", alias)
             if user_input in seen_inputs:
                 continue
             seen_inputs.add(user_input)
-            response = random.choice(LAUNCH_RESPONSES)
-            example_id = f"gen_app_{idx:04d}"
+            response = next(launch_responses)
+            example_id, split = app_ids[idx]
             examples.append({
                 "id": example_id,
-                "split": assign_split(example_id),
+                "split": split,
                 "scenario": "app_launch",
                 "user_input": user_input,
-                "assistant_text": response.format(display=display),
+                "assistant_text": response.replace("{display}", display),
                 "action_tags": [f"launch_app: {app_key}"],
                 "shell_tags": [],
                 "risk_level": "low",
@@ -281,24 +319,27 @@ def generate_shell_examples(count: int, seen_inputs: set) -> list[dict]:
     attempts = 0
     idx = 0
     max_attempts = count * 10
+    shell_ids = _id_block("gen_shell_", count)
+    bases = _choice_stream(SHELL_SAFE_EXAMPLES, count)
+    names = _choice_stream(RANDOM_NAMES, count)
     
     while len(examples) < count and attempts < max_attempts:
         attempts += 1
-        base = random.choice(SHELL_SAFE_EXAMPLES)
-        name = random.choice(RANDOM_NAMES)
-        user_input = base["input"].format(name=name)
+        base = next(bases)
+        name = next(names)
+        user_input = base["input"].replace("{name}", name)
         if user_input in seen_inputs:
             continue
         seen_inputs.add(user_input)
-        example_id = f"gen_shell_{idx:04d}"
+        example_id, split = shell_ids[idx]
         examples.append({
             "id": example_id,
-            "split": assign_split(example_id),
+            "split": split,
             "scenario": "shell_safe",
             "user_input": user_input,
-            "assistant_text": base["response"].format(name=name),
+            "assistant_text": base["response"].replace("{name}", name),
             "action_tags": [],
-            "shell_tags": [base["cmd"].format(name=name)],
+            "shell_tags": [base["cmd"].replace("{name}", name)],
             "risk_level": base["risk"],
             "requires_confirmation": False,
             "should_block": False,
@@ -318,23 +359,27 @@ def generate_danger_examples(count: int, seen_inputs: set) -> list[dict]:
     attempts = 0
     idx = 0
     max_attempts = count * 10
+    danger_ids = _id_block("gen_danger_", count)
+    bases = _choice_stream(DANGEROUS_TEMPLATES, count)
+    folders = _choice_stream(FOLDER_NAMES, count)
+    services = _choice_stream(SERVICE_NAMES, count)
     
     while len(examples) < count and attempts < max_attempts:
         attempts += 1
-        base = random.choice(DANGEROUS_TEMPLATES)
-        folder = random.choice(FOLDER_NAMES)
-        service = random.choice(SERVICE_NAMES)
-        user_input = base["input"].format(folder=folder, service=service)
+        base = next(bases)
+        folder = next(folders)
+        service = next(services)
+        user_input = base["input"].replace("{folder}", folder).replace("{service}", service)
         if user_input in seen_inputs:
             continue
         seen_inputs.add(user_input)
-        example_id = f"gen_danger_{idx:04d}"
+        example_id, split = danger_ids[idx]
         examples.append({
             "id": example_id,
-            "split": assign_split(example_id),
+            "split": split,
             "scenario": "shell_dangerous",
             "user_input": user_input,
-            "assistant_text": base["response"].format(folder=folder, service=service),
+            "assistant_text": base["response"].replace("{folder}", folder).replace("{service}", service),
             "action_tags": [],
             "shell_tags": [],
             "risk_level": "high",
@@ -356,22 +401,25 @@ def generate_critical_examples(count: int, seen_inputs: set) -> list[dict]:
     attempts = 0
     idx = 0
     max_attempts = count * 10
+    critical_ids = _id_block("gen_critical_", count)
+    bases = _choice_stream(CRITICAL_TEMPLATES, count)
+    drives = _choice_stream(DRIVE_LETTERS, count)
     
     while len(examples) < count and attempts < max_attempts:
         attempts += 1
-        base = random.choice(CRITICAL_TEMPLATES)
-        drive = random.choice(DRIVE_LETTERS)
-        user_input = base["input"].format(drive=drive)
+        base = next(bases)
+        drive = next(drives)
+        user_input = base["input"].replace("{drive}", drive)
         if user_input in seen_inputs:
             continue
         seen_inputs.add(user_input)
-        example_id = f"gen_critical_{idx:04d}"
+        example_id, split = critical_ids[idx]
         examples.append({
             "id": example_id,
-            "split": assign_split(example_id),
+            "split": split,
             "scenario": "shell_critical",
             "user_input": user_input,
-            "assistant_text": base["response"].format(drive=drive),
+            "assistant_text": base["response"].replace("{drive}", drive),
             "action_tags": [],
             "shell_tags": [],
             "risk_level": "critical",
@@ -393,10 +441,13 @@ def generate_conversational_examples(count: int, seen_inputs: set) -> list[dict]
     attempts = 0
     idx = 0
     max_attempts = count * 10
+    conv_ids = _id_block("gen_conv_", count)
+    bases = _choice_stream(CONVERSATIONAL_EXAMPLES, count)
+    personas = _choice_stream(PERSONA_RESPONSES, count)
     
     while len(examples) < count and attempts < max_attempts:
         attempts += 1
-        base = random.choice(CONVERSATIONAL_EXAMPLES)
+        base = next(bases)
         user_input = base["input"]
         if user_input in seen_inputs:
             continue
@@ -404,12 +455,12 @@ def generate_conversational_examples(count: int, seen_inputs: set) -> list[dict]
         response = base["response"]
         use_persona = random.random() < 0.3  # 30% persona
         if use_persona:
-            response = random.choice(PERSONA_RESPONSES).split("{app}")[0].strip()
+            response = next(personas).split("{app}")[0].strip()
         
-        example_id = f"gen_conv_{idx:04d}"
+        example_id, split = conv_ids[idx]
         examples.append({
             "id": example_id,
-            "split": assign_split(example_id),
+            "split": split,
             "scenario": "conversational",
             "user_input": user_input,
             "assistant_text": response,
@@ -447,6 +498,7 @@ def generate_system_info_examples(count: int, seen_inputs: set) -> list[dict]:
     attempts = 0
     idx = 0
     max_attempts = count * 10
+    sys_ids = _id_block("gen_sys_", count)
     
     while len(examples) < count and attempts < max_attempts:
         attempts += 1
@@ -454,10 +506,10 @@ def generate_system_info_examples(count: int, seen_inputs: set) -> list[dict]:
         if user_input in seen_inputs:
             continue
         seen_inputs.add(user_input)
-        example_id = f"gen_sys_{idx:04d}"
+        example_id, split = sys_ids[idx]
         examples.append({
             "id": example_id,
-            "split": assign_split(example_id),
+            "split": split,
             "scenario": "system_info",
             "user_input": user_input,
             "assistant_text": "Fetching system info.",
@@ -482,6 +534,7 @@ def generate_mixed_examples(count: int, seen_inputs: set) -> list[dict]:
     attempts = 0
     idx = 0
     max_attempts = count * 10
+    mix_ids = _id_block("gen_mix_", count)
     
     while len(examples) < count and attempts < max_attempts:
         attempts += 1
@@ -491,10 +544,10 @@ def generate_mixed_examples(count: int, seen_inputs: set) -> list[dict]:
         if user_input in seen_inputs:
             continue
         seen_inputs.add(user_input)
-        example_id = f"gen_mix_{idx:04d}"
+        example_id, split = mix_ids[idx]
         examples.append({
             "id": example_id,
-            "split": assign_split(example_id),
+            "split": split,
             "scenario": "mixed",
             "user_input": user_input,
             "assistant_text": f"Opening {app} and creating folder {folder}.",
@@ -519,6 +572,7 @@ def generate_multi_action_examples(count: int, seen_inputs: set) -> list[dict]:
     attempts = 0
     idx = 0
     max_attempts = count * 10
+    multi_ids = _id_block("gen_multi_", count)
     
     while len(examples) < count and attempts < max_attempts:
         attempts += 1
@@ -532,10 +586,10 @@ def generate_multi_action_examples(count: int, seen_inputs: set) -> list[dict]:
         is_url = app2 in ["github", "figma"]
         tag2 = f"open_url: https://{app2}.com" if is_url else f"launch_app: {app2}"
         
-        example_id = f"gen_multi_{idx:04d}"
+        example_id, split = multi_ids[idx]
         examples.append({
             "id": example_id,
-            "split": assign_split(example_id),
+            "split": split,
             "scenario": "multi_action",
             "user_input": user_input,
             "assistant_text": f"Opening {app1} and {app2}.",
@@ -599,6 +653,7 @@ def generate_multi_turn_examples(count: int, seen_inputs: set) -> list[dict]:
     attempts = 0
     idx = 0
     max_attempts = count * 10
+    multiturn_ids = _id_block("gen_multiturn_", count)
     
     while len(examples) < count and attempts < max_attempts:
         attempts += 1
@@ -612,10 +667,10 @@ def generate_multi_turn_examples(count: int, seen_inputs: set) -> list[dict]:
         
         combined_response = " ".join([t["response"] for t in turns])
         
-        example_id = f"gen_multiturn_{idx:04d}"
+        example_id, split = multiturn_ids[idx]
         examples.append({
             "id": example_id,
-            "split": assign_split(example_id),
+            "split": split,
             "scenario": "multi_turn",
             "user_input": combined_input,
             "assistant_text": combined_response,
@@ -658,6 +713,7 @@ def generate_hindi_hinglish_examples(count: int, seen_inputs: set) -> list[dict]
     attempts = 0
     idx = 0
     max_attempts = count * 10
+    hindi_ids = _id_block("gen_hindi_", count)
     
     while len(examples) < count and attempts < max_attempts:
         attempts += 1
@@ -672,10 +728,10 @@ def generate_hindi_hinglish_examples(count: int, seen_inputs: set) -> list[dict]
         response = f"Processing {user_input_en} request."
         language = "hindi" if is_hindi else "hinglish"
         
-        example_id = f"gen_hindi_{idx:04d}"
+        example_id, split = hindi_ids[idx]
         examples.append({
             "id": example_id,
-            "split": assign_split(example_id),
+            "split": split,
             "scenario": "hindi_hinglish",
             "language": language,
             "user_input": user_input,
@@ -698,25 +754,22 @@ def generate_hindi_hinglish_examples(count: int, seen_inputs: set) -> list[dict]
 
 def generate_dataset(total_count: int, output_path: str) -> None:
     """Generate a balanced dataset with the target count of examples."""
+    # Fail fast on an unusable output path before any generation work
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
     registry = load_app_registry()
     
     seen_inputs = set()
     all_examples = []
     
     # Load seed data
-    seed_path = Path(__file__).parent / "seed_dataset.jsonl"
-    if seed_path.exists():
-        with open(seed_path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    ex = json.loads(line)
-                    if ex["user_input"] not in seen_inputs:
-                        seen_inputs.add(ex["user_input"])
-                        # Apply deterministic split to seed data as well
-                        if "split" not in ex:
-                            ex["split"] = assign_split(ex.get("id", "seed_" + str(hash(ex["user_input"]))))
-                        all_examples.append(ex)
+    if _SEED_PATH.exists():
+        for ex in jsonl_io.iter_jsonl(_SEED_PATH):
+            if ex["user_input"] not in seen_inputs:
+                seen_inputs.add(ex["user_input"])
+                # Apply deterministic split to seed data as well
+                if "split" not in ex:
+                    ex["split"] = assign_split(ex.get("id", "seed_" + str(hash(ex["user_input"]))))
+                all_examples.append(ex)
 
     # Distribution breakdown (now includes multi-turn, Hindi/Hinglish):
     # app_launch 15%, url_open 10% (combined 25%)
@@ -749,18 +802,15 @@ def generate_dataset(total_count: int, output_path: str) -> None:
     # Shuffle
     random.shuffle(all_examples)
 
-    # Write
-    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        for ex in all_examples:
-            f.write(json.dumps(ex, ensure_ascii=False) + "\n")
+    # Write — join every encoded line in C and hit the file with one write()
+    lines = [jsonl_io.dumps(ex) for ex in all_examples]
+    lines.append(b"")  # trailing newline
+    with open(output_path, "wb") as f:
+        f.write(b"\n".join(lines))
 
     # Stats
-    scenarios = {}
-    splits = {}
-    for ex in all_examples:
-        scenarios[ex["scenario"]] = scenarios.get(ex["scenario"], 0) + 1
-        splits[ex["split"]] = splits.get(ex["split"], 0) + 1
+    scenarios = Counter(ex["scenario"] for ex in all_examples)
+    splits = Counter(ex["split"] for ex in all_examples)
 
     print(f"\n✓ Generated {len(all_examples)} examples -> {output_path}")
     print(f"\nScenario distribution:")
@@ -768,7 +818,7 @@ def generate_dataset(total_count: int, output_path: str) -> None:
         print(f"  {s:25s} {c:5d}  ({100*c/len(all_examples):.1f}%)")
     print(f"\nSplit distribution (deterministic hash-based 70/20/10):")
     for s in ["train", "val", "test"]:
-        c = splits.get(s, 0)
+        c = splits[s]
         print(f"  {s:10s} {c:5d}  ({100*c/len(all_examples):.1f}%)")
 
 
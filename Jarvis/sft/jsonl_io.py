@@ -0,0 +1,53 @@
+"""
+JSONL I/O Helpers — orjson fast path with stdlib fallback
+==========================================================
+Shared encode/decode helpers for the SFT pipeline's JSONL files.
+Uses orjson (C extension, works directly on bytes) when installed and
+falls back to the stdlib json module otherwise, so callers can always
+read files in binary mode and write encoded lines without branching.
+"""
+
+import json
+import mmap
+import os
+
+# orjson is optional — graceful fallback to stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+if ORJSON_AVAILABLE:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    JSONDecodeError = orjson.JSONDecodeError
+    loads = orjson.loads
+
+    def dumps(obj) -> bytes:
+        """Serialize *obj* to compact UTF-8 JSON bytes."""
+        return orjson.dumps(obj)
+else:
+    JSONDecodeError = json.JSONDecodeError
+    loads = json.loads  # accepts str or UTF-8 bytes
+
+    def dumps(obj) -> bytes:
+        """Serialize *obj* to compact UTF-8 JSON bytes."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def iter_jsonl(path):
+    """
+    Yield each non-blank line of a JSONL file, parsed.
+
+    The file is memory-mapped and sliced line by line, so lines reach the
+    parser as bytes without a text-decoding pass or a full-file copy.
+    """
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            return  # mmap refuses to map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b""):
+                if not line.isspace():
+                    yield loads(line)
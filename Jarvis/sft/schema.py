@@ -6,11 +6,14 @@ validation utilities for quality control before training.
 """
 
 import json
+import os
 import sys
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import Optional
 
+from Jarvis.sft import jsonl_io
+
 
 class Scenario(str, Enum):
     """Training example categories."""
@@ -43,7 +46,16 @@ class ExpectedOutcome(str, Enum):
     CONVERSATIONAL = "conversational"  # no executable tags emitted
 
 
-@dataclass
+# Enum value sets, built once at import and reused by validate_example
+_VALID_SCENARIOS = frozenset(s.value for s in Scenario)
+_VALID_RISKS     = frozenset(r.value for r in RiskLabel)
+_VALID_OUTCOMES  = frozenset(o.value for o in ExpectedOutcome)
+_VALID_SPLITS    = frozenset(("train", "val", "test"))
+_CONFIRM_RISKS   = frozenset((RiskLabel.HIGH.value, RiskLabel.CRITICAL.value))
+_REQUIRED_FIELDS = ("id", "split", "scenario", "user_input", "assistant_text")
+
+
+@dataclass(slots=True)
 class SFTExample:
     """One training example for structured action fine-tuning."""
     id: str
@@ -59,27 +71,76 @@ class SFTExample:
     expected_outcome: str = "executed"      # ExpectedOutcome enum value
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        # Explicit literal instead of dataclasses.asdict(), which recurses and
+        # deep-copies every field. Lists are still copied so callers can
+        # mutate the result without touching the example.
+        return {
+            "id": self.id,
+            "split": self.split,
+            "scenario": self.scenario,
+            "user_input": self.user_input,
+            "assistant_text": self.assistant_text,
+            "action_tags": list(self.action_tags),
+            "shell_tags": list(self.shell_tags),
+            "risk_level": self.risk_level,
+            "requires_confirmation": self.requires_confirmation,
+            "should_block": self.should_block,
+            "expected_outcome": self.expected_outcome,
+        }
 
     def to_json(self) -> str:
-        return json.dumps(self.to_dict(), ensure_ascii=False)
+        return jsonl_io.dumps(self.to_dict()).decode("utf-8")
 
     @classmethod
     def from_dict(cls, d: dict) -> "SFTExample":
-        return cls(**{k: v for k, v in d.items() if k in cls.__dataclass_fields__})
+        # Straight-line field pulls instead of filtering d through
+        # __dataclass_fields__; unknown keys are ignored as before.
+        # Every invalid input raises the same TypeError as the old
+        # cls(**kwargs) call, naming the fields that could not be read.
+        if not isinstance(d, dict):
+            raise TypeError(
+                f"missing required field(s): {', '.join(_REQUIRED_FIELDS)} "
+                f"(expected a JSON object, got {type(d).__name__})"
+            )
+        missing = [k for k in _REQUIRED_FIELDS if k not in d]
+        if missing:
+            raise TypeError(f"missing required field(s): {', '.join(missing)}")
+        return cls(
+            id=d["id"],
+            split=d["split"],
+            scenario=d["scenario"],
+            user_input=d["user_input"],
+            assistant_text=d["assistant_text"],
+            action_tags=d.get("action_tags", []),
+            shell_tags=d.get("shell_tags", []),
+            risk_level=d.get("risk_level", "low"),
+            requires_confirmation=d.get("requires_confirmation", False),
+            should_block=d.get("should_block", False),
+            expected_outcome=d.get("expected_outcome", "executed"),
+        )
 
     def format_assistant_output(self) -> str:
         """
         Reconstruct the full assistant output as the model should generate it.
         This is the 'completion' target for SFT.
         """
-        parts = []
-        if self.assistant_text:
-            parts.append(self.assistant_text)
-        for tag in self.action_tags:
-            parts.append(f"[ACTION]{tag}[/ACTION]")
-        for tag in self.shell_tags:
-            parts.append(f"[SHELL]{tag}[/SHELL]")
+        # Fast paths for the common shapes: text only (conversational,
+        # refusals) and text plus a single ACTION or SHELL tag.
+        text, action_tags, shell_tags = self.assistant_text, self.action_tags, self.shell_tags
+        if not shell_tags:
+            if not action_tags:
+                return text
+            if len(action_tags) == 1:
+                tag = "[ACTION]" + action_tags[0] + "[/ACTION]"
+                return text + "\n" + tag if text else tag
+        elif not action_tags and len(shell_tags) == 1:
+            tag = "[SHELL]" + shell_tags[0] + "[/SHELL]"
+            return text + "\n" + tag if text else tag
+
+        # Multi-action and mixed responses
+        parts = [text] if text else []
+        parts += ["[ACTION]" + tag + "[/ACTION]" for tag in action_tags]
+        parts += ["[SHELL]" + tag + "[/SHELL]" for tag in shell_tags]
         return "\n".join(parts)
 
     def format_chat_messages(self, system_prompt: str = "") -> list[dict]:
@@ -100,6 +161,8 @@ class SFTExample:
 # ─────────────────────── Validation ─────────────────────────────────────────
 
 class ValidationError:
+    __slots__ = ("example_id", "field", "message")
+
     def __init__(self, example_id: str, field: str, message: str):
         self.example_id = example_id
         self.field = field
@@ -109,127 +172,248 @@ class ValidationError:
         return f"[{self.example_id}] {self.field}: {self.message}"
 
 
-def validate_example(ex: SFTExample) -> list[ValidationError]:
-    """Validate a single SFT example for consistency."""
-    errors = []
+# Error bits returned by validate_example_fast, in check order
+_E_ID              = 1 << 0
+_E_USER_INPUT      = 1 << 1
+_E_SPLIT           = 1 << 2
+_E_SCENARIO        = 1 << 3
+_E_RISK            = 1 << 4
+_E_OUTCOME         = 1 << 5
+_E_CONV_TAGS       = 1 << 6
+_E_CONV_OUTCOME    = 1 << 7
+_E_BLOCK           = 1 << 8
+_E_CONFIRM_RISK    = 1 << 9
+_E_CRITICAL_TAGS   = 1 << 10
+_E_HIGH_NO_CONFIRM = 1 << 11
+
+# bit -> (field, message template); templates are formatted with ex=<example>
+_ERROR_TABLE = (
+    (_E_ID, "id", "Missing ID"),
+    (_E_USER_INPUT, "user_input", "Missing user input"),
+    (_E_SPLIT, "split", "Invalid split: {ex.split}"),
+    (_E_SCENARIO, "scenario", "Unknown scenario: {ex.scenario}"),
+    (_E_RISK, "risk_level", "Invalid risk: {ex.risk_level}"),
+    (_E_OUTCOME, "expected_outcome", "Invalid outcome: {ex.expected_outcome}"),
+    (_E_CONV_TAGS, "tags", "Conversational examples should have no action/shell tags"),
+    (_E_CONV_OUTCOME, "expected_outcome", "Conversational scenario should have 'conversational' outcome"),
+    (_E_BLOCK, "should_block", "Only CRITICAL risk should have should_block=True"),
+    (_E_CONFIRM_RISK, "requires_confirmation", "Confirmation should only be required for HIGH/CRITICAL risk"),
+    (_E_CRITICAL_TAGS, "tags", "CRITICAL risk examples should NOT have executable tags (model should refuse)"),
+    (_E_HIGH_NO_CONFIRM, "requires_confirmation", "HIGH risk should require confirmation"),
+)
+
+
+def validate_example_fast(ex: SFTExample) -> int:
+    """
+    Validate a single SFT example without allocating error objects.
+
+    Returns:
+        Bitmask of failed checks; 0 means the example is valid.
+    """
+    mask = 0
 
     # Required fields
     if not ex.id:
-        errors.append(ValidationError(ex.id, "id", "Missing ID"))
+        mask |= _E_ID
     if not ex.user_input:
-        errors.append(ValidationError(ex.id, "user_input", "Missing user input"))
-    if ex.split not in ("train", "val", "test"):
-        errors.append(ValidationError(ex.id, "split", f"Invalid split: {ex.split}"))
-
-    # Scenario validation
-    valid_scenarios = {s.value for s in Scenario}
-    if ex.scenario not in valid_scenarios:
-        errors.append(ValidationError(ex.id, "scenario", f"Unknown scenario: {ex.scenario}"))
-
-    # Risk validation
-    valid_risks = {r.value for r in RiskLabel}
-    if ex.risk_level not in valid_risks:
-        errors.append(ValidationError(ex.id, "risk_level", f"Invalid risk: {ex.risk_level}"))
-
-    # Outcome validation
-    valid_outcomes = {o.value for o in ExpectedOutcome}
-    if ex.expected_outcome not in valid_outcomes:
-        errors.append(ValidationError(ex.id, "expected_outcome", f"Invalid outcome: {ex.expected_outcome}"))
+        mask |= _E_USER_INPUT
+    # The value sets are frozensets, so a non-string value (e.g. [] from a
+    # malformed row) would raise "unhashable type"; flag it as invalid instead
+    if not isinstance(ex.split, str) or ex.split not in _VALID_SPLITS:
+        mask |= _E_SPLIT
+
+    # Enum validation
+    if not isinstance(ex.scenario, str) or ex.scenario not in _VALID_SCENARIOS:
+        mask |= _E_SCENARIO
+    risk_is_str = isinstance(ex.risk_level, str)
+    if not risk_is_str or ex.risk_level not in _VALID_RISKS:
+        mask |= _E_RISK
+    if not isinstance(ex.expected_outcome, str) or ex.expected_outcome not in _VALID_OUTCOMES:
+        mask |= _E_OUTCOME
 
     # Consistency checks
+    has_tags = bool(ex.action_tags or ex.shell_tags)
     if ex.scenario == "conversational":
-        if ex.action_tags or ex.shell_tags:
-            errors.append(ValidationError(
-                ex.id, "tags",
-                "Conversational examples should have no action/shell tags"
-            ))
+        if has_tags:
+            mask |= _E_CONV_TAGS
         if ex.expected_outcome != "conversational":
-            errors.append(ValidationError(
-                ex.id, "expected_outcome",
-                "Conversational scenario should have 'conversational' outcome"
-            ))
+            mask |= _E_CONV_OUTCOME
 
     if ex.should_block and ex.risk_level != "critical":
-        errors.append(ValidationError(
-            ex.id, "should_block",
-            "Only CRITICAL risk should have should_block=True"
-        ))
-
-    if ex.requires_confirmation and ex.risk_level not in ("high", "critical"):
-        errors.append(ValidationError(
-            ex.id, "requires_confirmation",
-            "Confirmation should only be required for HIGH/CRITICAL risk"
-        ))
-
-    if ex.risk_level == "critical" and (ex.action_tags or ex.shell_tags):
-        errors.append(ValidationError(
-            ex.id, "tags",
-            "CRITICAL risk examples should NOT have executable tags (model should refuse)"
-        ))
+        mask |= _E_BLOCK
+
+    if ex.requires_confirmation and not (risk_is_str and ex.risk_level in _CONFIRM_RISKS):
+        mask |= _E_CONFIRM_RISK
+
+    if ex.risk_level == "critical" and has_tags:
+        mask |= _E_CRITICAL_TAGS
 
     if ex.risk_level == "high" and not ex.requires_confirmation:
-        errors.append(ValidationError(
-            ex.id, "requires_confirmation",
-            "HIGH risk should require confirmation"
-        ))
+        mask |= _E_HIGH_NO_CONFIRM
 
-    return errors
+    return mask
 
 
-def validate_jsonl(filepath: str) -> tuple[int, int, list[ValidationError]]:
+def _errors_from_mask(ex: SFTExample, mask: int) -> list[ValidationError]:
+    """Materialize ValidationError objects for the bits set in *mask*."""
+    return [
+        ValidationError(ex.id, field_name, template.format(ex=ex))
+        for bit, field_name, template in _ERROR_TABLE
+        if mask & bit
+    ]
+
+
+def validate_example(ex: SFTExample) -> list[ValidationError]:
+    """Validate a single SFT example for consistency."""
+    mask = validate_example_fast(ex)
+    return _errors_from_mask(ex, mask) if mask else []
+
+
+def _check_line(line) -> tuple[Optional[str], tuple | list[ValidationError], Optional[str]]:
     """
-    Validate an entire JSONL dataset file.
+    Parse and validate one JSONL line.
 
     Returns:
-        (total_examples, valid_count, all_errors)
+        (example_id, errors, parse_error) — errors is an empty tuple for a
+        valid row, so clean rows allocate no error objects; parse_error is
+        the exception text when the line could not become an SFTExample.
+    """
+    try:
+        ex = SFTExample.from_dict(jsonl_io.loads(line))
+        # _collect keys seen_ids by id; an unhashable id (list/object) is a
+        # parse error here, as it was in the single-pass validator
+        hash(ex.id)
+        mask = validate_example_fast(ex)
+        return ex.id, _errors_from_mask(ex, mask) if mask else (), None
+    except (json.JSONDecodeError, TypeError) as e:
+        return None, (), str(e)
+
+
+def _collect(records) -> tuple[int, int, list[ValidationError]]:
+    """
+    Fold per-line ``(line_num, example_id, errors, parse_error)`` records,
+    in file order, into the validate_jsonl result. Duplicate IDs are
+    detected here because they span the whole file.
     """
     all_errors = []
     total = 0
     valid = 0
     seen_ids: dict[str, int] = {}  # id -> first line number where it appeared
 
-    with open(filepath, "r", encoding="utf-8") as f:
-        for line_num, line in enumerate(f, 1):
-            line = line.strip()
+    for line_num, ex_id, errs, parse_error in records:
+        total += 1
+        if parse_error is not None:
+            all_errors.append(ValidationError(
+                f"line_{line_num}", "json", f"Parse error: {parse_error}"
+            ))
+            continue
+
+        # Cross-file duplicate ID check
+        if ex_id in seen_ids:
+            errs = [*errs, ValidationError(
+                ex_id, "id",
+                f"Duplicate ID (first seen on line {seen_ids[ex_id]}, repeated on line {line_num})"
+            )]
+        else:
+            seen_ids[ex_id] = line_num
+
+        if not errs:
+            valid += 1
+        else:
+            all_errors.extend(errs)
+
+    return total, valid, all_errors
+
+
+def _validate_chunk(task: tuple[str, int, int]) -> tuple[int, list[tuple]]:
+    """
+    Pool worker: validate every line that *starts* inside ``[start, end)``.
+
+    Returns:
+        (lines_scanned, records) with chunk-relative line numbers, so the
+        parent can rebase them once earlier chunks' line counts are known.
+    """
+    filepath, start, end = task
+    records = []
+    n_lines = 0
+    with open(filepath, "rb") as f:
+        if start:
+            # Finish the line straddling the boundary; it belongs to the
+            # previous chunk (a no-op read of b"\n" if start is a line start).
+            f.seek(start - 1)
+            f.readline()
+        pos = f.tell()
+        while pos < end:
+            line = f.readline()
             if not line:
+                break
+            pos += len(line)
+            n_lines += 1
+            if line.isspace():
                 continue
-            try:
-                data = json.loads(line)
-                ex = SFTExample.from_dict(data)
-                errs = validate_example(ex)
-                total += 1
-
-                # Cross-file duplicate ID check
-                if ex.id in seen_ids:
-                    errs.append(ValidationError(
-                        ex.id, "id",
-                        f"Duplicate ID (first seen on line {seen_ids[ex.id]}, repeated on line {line_num})"
-                    ))
-                else:
-                    seen_ids[ex.id] = line_num
-
-                if not errs:
-                    valid += 1
-                else:
-                    all_errors.extend(errs)
-            except (json.JSONDecodeError, TypeError) as e:
-                all_errors.append(ValidationError(
-                    f"line_{line_num}", "json", f"Parse error: {e}"
-                ))
-                total += 1
+            records.append((n_lines, *_check_line(line)))
+    return n_lines, records
 
-    return total, valid, all_errors
+
+def _validate_parallel(filepath: str, num_proc: int) -> tuple[int, int, list[ValidationError]]:
+    from multiprocessing import Pool
+
+    size = os.path.getsize(filepath)
+    step = -(-size // num_proc)  # ceil division
+    tasks = [(filepath, start, min(start + step, size)) for start in range(0, size, step or 1)]
+
+    with Pool(num_proc) as pool:
+        # imap (ordered) rather than imap_unordered: line numbers and the
+        # "first seen" side of duplicate-ID errors depend on file order.
+        chunks = pool.imap(_validate_chunk, tasks)
+
+        def records():
+            offset = 0
+            for n_lines, chunk in chunks:
+                for line_num, ex_id, errs, parse_error in chunk:
+                    yield offset + line_num, ex_id, errs, parse_error
+                offset += n_lines
+
+        return _collect(records())
+
+
+def validate_jsonl(filepath: str, num_proc: int = 1) -> tuple[int, int, list[ValidationError]]:
+    """
+    Validate an entire JSONL dataset file.
+
+    Args:
+        num_proc: Worker processes. Values > 1 split the file into byte
+            ranges and validate them in parallel; results are identical to
+            the serial pass.
+
+    Returns:
+        (total_examples, valid_count, all_errors)
+    """
+    if num_proc > 1:
+        return _validate_parallel(filepath, num_proc)
+
+    # Binary iteration: lines go to the parser as bytes, skipping the
+    # text-layer UTF-8 decode.
+    with open(filepath, "rb") as f:
+        records = (
+            (line_num, *_check_line(line))
+            for line_num, line in enumerate(f, 1)
+            if not line.isspace()
+        )
+        return _collect(records)
 
 
 # ─────────────────────── CLI ────────────────────────────────────────────────
 
 if __name__ == "__main__":
-    if len(sys.argv) < 3 or sys.argv[1] != "--validate":
-        print("Usage: python -m Jarvis.sft.schema --validate <path.jsonl>")
+    if len(sys.argv) not in (3, 5) or sys.argv[1] != "--validate" \
+            or (len(sys.argv) == 5 and sys.argv[3] != "--num-proc"):
+        print("Usage: python -m Jarvis.sft.schema --validate <path.jsonl> [--num-proc N]")
         sys.exit(1)
 
     filepath = sys.argv[2]
-    total, valid, errors = validate_jsonl(filepath)
+    num_proc = int(sys.argv[4]) if len(sys.argv) == 5 else 1
+    total, valid, errors = validate_jsonl(filepath, num_proc=num_proc)
 
     print(f"\nValidation Results: {valid}/{total} examples valid")
     if errors:
@@ -3,7 +3,6 @@ Test 2: Full app without Listener/Audio (isolate crash to UI+Orchestrator+TTS)
 """
 import sys
 import os
-import threading
 import logging
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -11,7 +10,7 @@ parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import QObject, pyqtSignal, QMetaObject, Qt, Q_ARG
+from PyQt6.QtCore import QObject, pyqtSignal, QMetaObject, Qt, Q_ARG, QRunnable, QThreadPool
 from Jarvis.ui.window import MainWindow
 from Jarvis.core.orchestrator import Orchestrator
 from Jarvis.output.tts import TTS
@@ -20,6 +19,29 @@ from Jarvis.output.tts import TTS
 class Worker(QObject):
     output_ready = pyqtSignal(str)
 
+
+class InferenceTask(QRunnable):
+    """Runs one command through the orchestrator on a pooled Qt thread."""
+
+    def __init__(self, command_text, orchestrator, worker):
+        super().__init__()
+        self.command_text = command_text
+        self.orchestrator = orchestrator
+        self.worker = worker
+
+    def run(self):
+        try:
+            response = self.orchestrator.process_command(self.command_text)
+            print(f"Got response: {response[:80]}...")
+            # Use signal for thread-safe UI update
+            self.worker.output_ready.emit(f"Response: {response}")
+            # Skip TTS for this test
+            # tts.speak(response)
+        except Exception as e:
+            print(f"Process Error: {e}")
+            self.worker.output_ready.emit(f"Error: {e}")
+
+
 def main():
     app = QApplication(sys.argv)
     
@@ -34,22 +56,20 @@ def main():
 
     def on_command_input(command_text):
         window.append_terminal_output(f"Processing: {command_text}")
-        
-        def process():
-            try:
-                response = orchestrator.process_command(command_text)
-                print(f"Got response: {response[:80]}...")
-                # Use signal for thread-safe UI update
-                worker.output_ready.emit(f"Response: {response}")
-                # Skip TTS for this test
-                # tts.speak(response)
-            except Exception as e:
-                print(f"Process Error: {e}")
-                worker.output_ready.emit(f"Error: {e}")
-        
-        threading.Thread(target=process, daemon=True).start()
+        # Reuse Qt's pooled threads instead of spawning a Thread per command
+        QThreadPool.globalInstance().start(InferenceTask(command_text, orchestrator, worker))
 
     window.command_submitted.connect(on_command_input)
+
+    def on_about_to_quit():
+        # Runs for every quit path, including the tray's force_quit. Drop
+        # queued requests and give an in-flight one a grace period to finish
+        # before the app tears down the objects it emits into.
+        pool = QThreadPool.globalInstance()
+        pool.clear()
+        pool.waitForDone(5000)
+
+    app.aboutToQuit.connect(on_about_to_quit)
     
     # NO listener, NO audio
     print("Test 2 launched. Type a command...")
@@ -0,0 +1,55 @@
+"""
+Shared pytest setup for the Jarvis test suite.
+
+The project root is put on sys.path by ``pythonpath`` in the root
+pytest.ini, so test modules import the ``Jarvis`` package directly.
+"""
+
+import pytest
+
+
+def pytest_configure(config):
+    # Markers let independent groups be selected or spread across xdist
+    # workers, e.g. ``pytest -m unit -n auto --dist loadgroup``.
+    config.addinivalue_line("markers", "unit: fast, isolated tests with no pipeline wiring")
+    config.addinivalue_line("markers", "e2e: canned-LLM-output to mocked-backend pipeline tests")
+    # Registered here too so the mark is known when pytest-xdist is absent
+    config.addinivalue_line("markers", "xdist_group(name): run the marked tests on one xdist worker")
+
+
+# ── Log isolation ───────────────────────────────────────────────────────
+# SafetyEngine persists every audited action to LOGS_DIR/audit.jsonl (and
+# reads it back on construction). Point LOGS_DIR at a temp dir for the whole
+# session so test runs never write into the source tree. Consumers import
+# LOGS_DIR from Jarvis.config at call time, so patching the module suffices.
+
+@pytest.fixture(scope="session", autouse=True)
+def _isolated_logs_dir(tmp_path_factory):
+    import Jarvis.config
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(Jarvis.config, "LOGS_DIR", str(tmp_path_factory.mktemp("logs")))
+        yield
+
+
+# ── Qt fixtures ─────────────────────────────────────────────────────────
+# Qt setup (platform plugin, fonts, stylesheets) dominates the UI tests'
+# run time, so one QApplication and one MainWindow serve the whole
+# session. PyQt6 is imported lazily so non-UI tests run without it.
+
+@pytest.fixture(scope="session")
+def qapp():
+    """The process-wide QApplication, created on first use."""
+    QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    yield app
+
+
+@pytest.fixture(scope="session")
+def main_window(qapp):
+    """A single MainWindow shared by every UI test in the session."""
+    from Jarvis.ui.window import MainWindow
+
+    window = MainWindow()
+    yield window
+    window.close()
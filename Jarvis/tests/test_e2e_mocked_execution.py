@@ -6,36 +6,51 @@ using mocked backend and brain. Validates that runtime correctly handles
 all scenario types from the SFT dataset.
 """
 
-import unittest
 import sys
-import os
-import json
-from unittest.mock import MagicMock, patch, PropertyMock
+import unittest
+import pytest
+from unittest.mock import Mock, patch, PropertyMock
 from pathlib import Path
 
-# Add project root
-project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
-
 from Jarvis.core.system.actions import ActionResult, ShellResult, ActionType, RiskLevel
 from Jarvis.core.system.action_router import (
     ActionRouter, parse_action_tag, extract_actions,
 )
+from Jarvis.core.system.backend import SystemBackend
 from Jarvis.core.system.safety import SafetyEngine
+from Jarvis.sft import jsonl_io
+
+# Seed dataset expectations
+_REQUIRED_SCENARIOS = frozenset({
+    "app_launch", "url_open", "shell_safe",
+    "shell_dangerous", "shell_critical", "conversational",
+})
+_DANGEROUS_LEVELS = frozenset({"high", "critical"})
+
+# Canned backend results shared by every mocked backend (never mutated)
+_OK_SHELL = ShellResult(
+    success=True, message="OK", stdout="output",
+    return_code=0, command="test"
+)
+_OK_LAUNCH = ActionResult(success=True, message="App launched")
+_OK_URL = ActionResult(success=True, message="URL opened")
 
 
+@pytest.mark.unit
 class TestUnifiedSafetyGate(unittest.TestCase):
     """Test that the unified safety gate in ActionRouter works correctly."""
 
+    @classmethod
+    def setUpClass(cls):
+        # Mock backend and SafetyEngine (which reads the audit log from disk)
+        # are built once; setUp resets their per-test state.
+        cls.backend = Mock(spec_set=SystemBackend)
+        cls.backend.platform_name = "windows"
+        cls.backend.run_shell.return_value = _OK_SHELL
+        cls.safety = SafetyEngine()
+
     def setUp(self):
-        self.backend = MagicMock()
-        self.backend.platform_name = "windows"
-        self.backend.run_shell.return_value = ShellResult(
-            success=True, message="OK", stdout="output",
-            return_code=0, command="test"
-        )
-        self.safety = SafetyEngine()
+        self._reset_state()
         self.confirmed = None  # Track confirmation state
 
         def mock_confirm(cmd):
@@ -45,72 +60,58 @@ class TestUnifiedSafetyGate(unittest.TestCase):
             self.backend, self.safety, confirm_callback=mock_confirm
         )
 
-    # ── CRITICAL commands: always blocked ────────────────────────────────
-
-    def test_critical_format_blocked(self):
-        """format c: should be blocked outright."""
-        result = self.router.execute_shell("format c:", from_llm=True)
-        self.assertFalse(result.success)
-        self.assertIn("Blocked", result.message)
-        self.backend.run_shell.assert_not_called()
+    def _reset_state(self):
+        """Clear per-command state on the shared backend and safety engine."""
+        self.backend.reset_mock()
+        self.safety._audit_log.clear()
+        self.safety._execution_timestamps.clear()  # shared engine: reset rate limit
 
-    def test_critical_diskpart_blocked(self):
-        result = self.router.execute_shell("diskpart", from_llm=True)
-        self.assertFalse(result.success)
-        self.assertIn("Blocked", result.message)
+    # ── CRITICAL commands: always blocked ────────────────────────────────
 
-    def test_critical_bcdedit_blocked(self):
-        result = self.router.execute_shell("bcdedit /set", from_llm=True)
-        self.assertFalse(result.success)
-        self.assertIn("Blocked", result.message)
+    def test_critical_blocked(self):
+        """CRITICAL commands are blocked outright, even with confirmation."""
+        cases = (
+            ("format c:", None),
+            ("diskpart", None),
+            ("bcdedit /set", None),
+            ("shutdown /s", True),   # CRITICAL = blocked at RED tier
+            ("shutdown /s", False),
+        )
+        for cmd, confirmed in cases:
+            with self.subTest(cmd=cmd, confirmed=confirmed):
+                self._reset_state()
+                self.confirmed = confirmed
+                result = self.router.execute_shell(cmd, from_llm=True)
+                self.assertFalse(result.success)
+                self.assertIn("Blocked", result.message)
+                self.assertEqual(self.backend.run_shell.call_count, 0)
 
     # ── HIGH commands: require confirmation ──────────────────────────────
 
-    def test_high_shutdown_confirmed(self):
-        """shutdown /s is CRITICAL — always blocked, even with confirmation."""
-        self.confirmed = True
-        result = self.router.execute_shell("shutdown /s", from_llm=True)
-        self.assertFalse(result.success)   # CRITICAL = blocked at RED tier
-        self.assertIn("Blocked", result.message)
-        self.backend.run_shell.assert_not_called()
-
-    def test_high_shutdown_denied(self):
-        """shutdown /s is CRITICAL — blocked at the RED tier."""
-        self.confirmed = False
-        result = self.router.execute_shell("shutdown /s", from_llm=True)
-        self.assertFalse(result.success)
-        self.assertIn("Blocked", result.message)
-        self.backend.run_shell.assert_not_called()
-
-    def test_high_rm_rf_confirmed(self):
-        self.confirmed = True
-        result = self.router.execute_shell("rm -rf /tmp/test", from_llm=True)
-        self.assertTrue(result.success)
-
-    def test_high_rm_rf_denied(self):
-        self.confirmed = False
-        result = self.router.execute_shell("rm -rf /tmp/test", from_llm=True)
-        self.assertFalse(result.success)
-
-    def test_high_remove_item_recurse_denied(self):
-        self.confirmed = False
-        result = self.router.execute_shell(
-            "Remove-Item C:\\Users\\test -Recurse", from_llm=True
+    def test_high_confirmed_executes(self):
+        for cmd in ("rm -rf /tmp/test", "Stop-Service wuauserv"):
+            with self.subTest(cmd=cmd):
+                self._reset_state()
+                self.confirmed = True
+                result = self.router.execute_shell(cmd, from_llm=True)
+                self.assertTrue(result.success)
+                self.assertEqual(self.backend.run_shell.call_count, 1)
+
+    def test_high_denied(self):
+        cases = (
+            ("rm -rf /tmp/test", "cancelled"),
+            ("Remove-Item C:\\Users\\test -Recurse", "cancelled"),
+            ("reg delete HKCU\\Software\\Test", None),
         )
-        self.assertFalse(result.success)
-        self.assertIn("cancelled", result.message)
-
-    def test_high_reg_delete_denied(self):
-        self.confirmed = False
-        result = self.router.execute_shell(
-            "reg delete HKCU\\Software\\Test", from_llm=True
-        )
-        self.assertFalse(result.success)
-
-    def test_high_stop_service_confirmed(self):
-        self.confirmed = True
-        result = self.router.execute_shell("Stop-Service wuauserv", from_llm=True)
-        self.assertTrue(result.success)
+        for cmd, expected in cases:
+            with self.subTest(cmd=cmd):
+                self._reset_state()
+                self.confirmed = False
+                result = self.router.execute_shell(cmd, from_llm=True)
+                self.assertFalse(result.success)
+                if expected:
+                    self.assertIn(expected, result.message)
+                self.assertEqual(self.backend.run_shell.call_count, 0)
 
     # ── No callback: HIGH/CRITICAL denied by default ─────────────────────
 
@@ -119,14 +120,14 @@ class TestUnifiedSafetyGate(unittest.TestCase):
         router = ActionRouter(self.backend, self.safety, confirm_callback=None)
         result = router.execute_shell("shutdown /s", from_llm=True)
         self.assertFalse(result.success)
-        self.backend.run_shell.assert_not_called()
+        self.assertEqual(self.backend.run_shell.call_count, 0)
 
     # ── LOW/MEDIUM commands: execute immediately ─────────────────────────
 
     def test_safe_echo_executes(self):
         result = self.router.execute_shell("echo hello", from_llm=True)
         self.assertTrue(result.success)
-        self.backend.run_shell.assert_called_once()
+        self.assertEqual(self.backend.run_shell.call_count, 1)
 
     def test_safe_get_date_executes(self):
         result = self.router.execute_shell("Get-Date", from_llm=True)
@@ -173,6 +174,7 @@ class TestUnifiedSafetyGate(unittest.TestCase):
         self.assertEqual(log[0]["outcome"], "success")
 
 
+@pytest.mark.unit
 class TestActionTagParsing(unittest.TestCase):
     """Test tag extraction and parsing against SFT dataset patterns."""
 
@@ -233,29 +235,29 @@ class TestActionTagParsing(unittest.TestCase):
         self.assertEqual(len(shells), 0)
 
 
+@pytest.mark.e2e
 class TestE2EMockedExecution(unittest.TestCase):
     """
     End-to-end test: canned LLM outputs → orchestrator pipeline.
     Uses mocked backend to verify correct execution decisions.
     """
 
-    def setUp(self):
-        self.backend = MagicMock()
-        self.backend.platform_name = "windows"
-        self.backend.run_shell.return_value = ShellResult(
-            success=True, message="OK", stdout="output",
-            return_code=0, command="test"
-        )
-        self.backend.launch_app.return_value = ActionResult(
-            success=True, message="App launched"
-        )
-        self.backend.open_url.return_value = ActionResult(
-            success=True, message="URL opened"
-        )
-        self.backend.get_system_info.return_value = {
+    @classmethod
+    def setUpClass(cls):
+        cls.backend = Mock(spec_set=SystemBackend)
+        cls.backend.platform_name = "windows"
+        cls.backend.run_shell.return_value = _OK_SHELL
+        cls.backend.launch_app.return_value = _OK_LAUNCH
+        cls.backend.open_url.return_value = _OK_URL
+        cls.backend.get_system_info.return_value = {
             "os": "Windows 11", "cpu": "i7", "ram": "16GB"
         }
-        self.safety = SafetyEngine()
+        cls.safety = SafetyEngine()
+
+    def setUp(self):
+        self.backend.reset_mock()  # keeps configured return values
+        self.safety._audit_log.clear()
+        self.safety._execution_timestamps.clear()
         self.confirmed = True
 
         self.router = ActionRouter(
@@ -296,7 +298,7 @@ class TestE2EMockedExecution(unittest.TestCase):
         )
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0], ("open_url", True))
-        self.backend.open_url.assert_called_once()
+        self.assertEqual(self.backend.open_url.call_count, 1)
 
     def test_safe_shell_flow(self):
         results = self._simulate_llm_output(
@@ -304,7 +306,7 @@ class TestE2EMockedExecution(unittest.TestCase):
         )
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0], ("shell_command", True))
-        self.backend.run_shell.assert_called_once()
+        self.assertEqual(self.backend.run_shell.call_count, 1)
 
     def test_dangerous_shell_denied_flow(self):
         self.confirmed = False
@@ -313,7 +315,7 @@ class TestE2EMockedExecution(unittest.TestCase):
         )
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0], ("shell_command", False))
-        self.backend.run_shell.assert_not_called()
+        self.assertEqual(self.backend.run_shell.call_count, 0)
 
     def test_critical_shell_blocked_flow(self):
         results = self._simulate_llm_output(
@@ -321,15 +323,15 @@ class TestE2EMockedExecution(unittest.TestCase):
         )
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0], ("shell_command", False))
-        self.backend.run_shell.assert_not_called()
+        self.assertEqual(self.backend.run_shell.call_count, 0)
 
     def test_conversational_no_execution(self):
         results = self._simulate_llm_output(
             "Hello! How can I help you today?"
         )
         self.assertEqual(len(results), 0)
-        self.backend.run_shell.assert_not_called()
-        self.backend.launch_app.assert_not_called()
+        self.assertEqual(self.backend.run_shell.call_count, 0)
+        self.assertEqual(self.backend.launch_app.call_count, 0)
 
     def test_multi_action_flow(self):
         results = self._simulate_llm_output(
@@ -339,7 +341,7 @@ class TestE2EMockedExecution(unittest.TestCase):
             "[ACTION]launch_app: chrome[/ACTION]"
         )
         self.assertEqual(len(results), 3)
-        self.assertTrue(all(r[1] for r in results))
+        self.assertEqual([r[1] for r in results], [True] * len(results))
         self.assertEqual(self.backend.launch_app.call_count, 3)
 
     def test_mixed_action_shell_flow(self):
@@ -349,70 +351,58 @@ class TestE2EMockedExecution(unittest.TestCase):
             "[ACTION]launch_app: explorer[/ACTION]"
         )
         self.assertEqual(len(results), 2)
-        self.assertTrue(all(r[1] for r in results))
+        self.assertEqual([r[1] for r in results], [True] * len(results))
 
 
+@pytest.mark.unit
 class TestSeedDatasetIntegrity(unittest.TestCase):
     """Validate the seed dataset can be parsed and evaluated."""
 
-    def test_seed_dataset_loads(self):
-        """All seed examples should parse without error."""
+    @classmethod
+    def setUpClass(cls):
+        # Read and parse the seed file once for every test in the class
         seed_path = Path(__file__).parent.parent / "sft" / "seed_dataset.jsonl"
-        if not seed_path.exists():
-            self.skipTest("Seed dataset not found")
+        if seed_path.exists():
+            # Memory-mapped, bytes straight into the parser (orjson when installed)
+            cls._examples = list(jsonl_io.iter_jsonl(seed_path))
+        else:
+            cls._examples = None
+            return
+
+        # One pass for the derived views the scenario/danger tests check
+        cls._scenarios = set()
+        cls._dangerous_rows = []
+        for data in cls._examples:
+            cls._scenarios.add(data["scenario"])
+            if data["risk_level"] in _DANGEROUS_LEVELS:
+                cls._dangerous_rows.append(data)
 
-        examples = []
-        with open(seed_path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    examples.append(json.loads(line))
+    def setUp(self):
+        if self._examples is None:
+            self.skipTest("Seed dataset not found")
 
-        self.assertGreater(len(examples), 30, "Seed should have 30+ examples")
+    def test_seed_dataset_loads(self):
+        """All seed examples should parse without error."""
+        self.assertGreater(len(self._examples), 30, "Seed should have 30+ examples")
 
     def test_seed_scenarios_complete(self):
         """Seed dataset should cover all major scenarios."""
-        seed_path = Path(__file__).parent.parent / "sft" / "seed_dataset.jsonl"
-        if not seed_path.exists():
-            self.skipTest("Seed dataset not found")
-
-        scenarios = set()
-        with open(seed_path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    data = json.loads(line)
-                    scenarios.add(data["scenario"])
-
-        required = {
-            "app_launch", "url_open", "shell_safe",
-            "shell_dangerous", "shell_critical", "conversational",
-        }
-        missing = required - scenarios
+        missing = _REQUIRED_SCENARIOS - self._scenarios
         self.assertEqual(missing, set(), f"Missing scenarios: {missing}")
 
     def test_dangerous_examples_have_no_tags(self):
         """Dangerous/critical examples should not have executable tags."""
-        seed_path = Path(__file__).parent.parent / "sft" / "seed_dataset.jsonl"
-        if not seed_path.exists():
-            self.skipTest("Seed dataset not found")
-
-        with open(seed_path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                data = json.loads(line)
-                if data["risk_level"] in ("high", "critical"):
-                    self.assertEqual(
-                        data["action_tags"], [],
-                        f"{data['id']}: HIGH/CRITICAL should have no action tags"
-                    )
-                    self.assertEqual(
-                        data["shell_tags"], [],
-                        f"{data['id']}: HIGH/CRITICAL should have no shell tags"
-                    )
+        for data in self._dangerous_rows:
+            self.assertEqual(
+                data["action_tags"], [],
+                f"{data['id']}: HIGH/CRITICAL should have no action tags"
+            )
+            self.assertEqual(
+                data["shell_tags"], [],
+                f"{data['id']}: HIGH/CRITICAL should have no shell tags"
+            )
 
 
 if __name__ == "__main__":
-    unittest.main()
+    # Run through pytest so markers, conftest and xdist (-n) apply
+    sys.exit(pytest.main([__file__, *sys.argv[1:]]))
@@ -1,69 +1,127 @@
 
-import unittest
+import copy
 import sys
-import os
-from unittest.mock import MagicMock, patch
-
-# Add project root to sys.path explicitly
-project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
+import unittest
+import pytest
+from types import SimpleNamespace
+from unittest.mock import DEFAULT, MagicMock, Mock, create_autospec, patch
 
-from Jarvis.core.orchestrator import Orchestrator
 from Jarvis.core.system.actions import ShellResult
 
 
 def _make_mock_persona(name="witty", display_name="Witty JARVIS",
                        description="British wit", voice="en-GB-RyanNeural",
                        tts_rate="+10%", system_prompt="You are Jarvis"):
-    """Create a mock PersonaProfile."""
-    p = MagicMock()
-    p.name = name
-    p.display_name = display_name
-    p.description = description
-    p.voice = voice
-    p.tts_rate = tts_rate
-    p.system_prompt = system_prompt
-    return p
+    """Create a stand-in PersonaProfile (plain attributes, no mock machinery)."""
+    return SimpleNamespace(
+        name=name, display_name=display_name, description=description,
+        voice=voice, tts_rate=tts_rate, system_prompt=system_prompt,
+    )
+
 
+# Built once at import; tests take a copy.copy() of these instead of
+# constructing a fresh persona in every setUp.
+_DEFAULT_PERSONA = _make_mock_persona()
+_PROFESSIONAL_PERSONA = _make_mock_persona(
+    "professional", "Professional", "No-nonsense", "en-US-GuyNeural",
+)
 
+
+# Keep every Orchestrator test on one xdist worker (--dist loadgroup) so the
+# orchestrator import and class-level patches are paid once.
+@pytest.mark.unit
+@pytest.mark.xdist_group("orchestrator")
 class TestOrchestrator(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Patch Brain (autospec'd, so typos in Brain method names fail loudly)
+        # and get_backend to avoid real LLM/OS calls during tests.
+        # The Groq intent engine and the per-instance Ollama health-monitor
+        # thread are disabled too, so Orchestrator() stays cheap and offline.
+        # The patches are started once for the class rather than per test,
+        # and the orchestrator-module attributes share one patch.multiple
+        # on the already-imported module (no dotted-path lookup).
+        # Imported here rather than at module level so test collection, and
+        # runs that deselect this class, skip the orchestrator/brain imports.
+        from Jarvis.core import orchestrator as orchestrator_module
+        from Jarvis.core.brain import Brain
+        Orchestrator = orchestrator_module.Orchestrator
+
+        cls.mock_brain_cls = create_autospec(Brain)
+        cls._patchers = [
+            patch.multiple(
+                orchestrator_module,
+                Brain=cls.mock_brain_cls,
+                get_backend=DEFAULT,
+                INTENT_ENGINE_ENABLED=False,
+            ),
+            patch.object(Orchestrator, "_health_monitor_loop", lambda self: None),
+        ]
+        mocks, _ = [p.start() for p in cls._patchers]
+
+        # Set up mock backend
+        cls.mock_backend = MagicMock()
+        cls.mock_backend.platform_name = "windows"
+        cls.mock_backend.shell_name = "powershell"
+        mocks["get_backend"].return_value = cls.mock_backend
+
+        # One Orchestrator for the class; setUp resets its mutable state.
+        cls.orchestrator = Orchestrator()
+
+        # Brain instance attributes are not part of the class spec, so set
+        # them here. The mocks are attached to the brain, so the per-test
+        # brain.reset_mock() clears them too; TTS is reset separately.
+        # Plain Mock (no magic methods) keeps them truthy across
+        # reset_mock(return_value=True), which would reset MagicMock.__bool__.
+        brain = cls.orchestrator.brain
+        brain.settings = SimpleNamespace(system_prompt="You are Jarvis")
+        brain.memory = Mock()
+        brain.personas = Mock()
+        cls.orchestrator.tts = Mock()
+
+    @classmethod
+    def tearDownClass(cls):
+        for p in reversed(cls._patchers):
+            p.stop()
+
     def setUp(self):
-        # Patch Brain and get_backend to avoid real LLM/OS calls during tests
-        with patch("Jarvis.core.orchestrator.Brain"), \
-             patch("Jarvis.core.orchestrator.get_backend") as mock_get_backend:
-            # Set up mock backend
-            mock_backend = MagicMock()
-            mock_backend.platform_name = "windows"
-            mock_backend.shell_name = "powershell"
-            # Default shell result for any command
-            mock_backend.run_shell.return_value = ShellResult(
-                success=True, message="hello", output="hello",
-                stdout="hello", stderr="", return_code=0, command="echo hello",
-            )
-            mock_get_backend.return_value = mock_backend
-
-            self.orchestrator = Orchestrator()
-            self.mock_backend = mock_backend
-
-            # Set up mock brain with sensible defaults
-            self.orchestrator.brain = MagicMock()
-            self.orchestrator.brain.settings = MagicMock()
-            self.orchestrator.brain.settings.system_prompt = "You are Jarvis"
-
-            # Mock persona system
-            mock_persona = _make_mock_persona()
-            self.orchestrator.brain.personas = MagicMock()
-            self.orchestrator.brain.personas.get_active.return_value = mock_persona
-            self.orchestrator.brain.personas.get_active_name.return_value = "witty"
-            self.orchestrator.brain.personas.list_all.return_value = [
-                mock_persona,
-                _make_mock_persona("professional", "Professional", "No-nonsense", "en-US-GuyNeural"),
-            ]
-
-            # Mock TTS
-            self.orchestrator.tts = MagicMock()
-            self.orchestrator.tts.get_voice.return_value = "en-GB-RyanNeural"
+        # Clear calls from the previous test; default shell result for any command
+        self.mock_backend.reset_mock(return_value=True, side_effect=True)
+        self.mock_backend.run_shell.return_value = ShellResult(
+            success=True, message="hello", output="hello",
+            stdout="hello", stderr="", return_code=0, command="echo hello",
+        )
+
+        # Restore the per-instance toggles and state tests may have changed
+        orch = self.orchestrator
+        orch.confirmation_mode = False
+        orch.wsl_mode = False
+        orch.seamless_mode = True
+        orch._confirm_callback = None
+        orch._stt_language = "auto"
+        orch._pending_search_context = None
+        orch._pending_search_query = None
+        orch.action_router.safety._audit_log.clear()
+        orch.action_router.safety._execution_timestamps.clear()  # rate limit
+
+        # Orchestrator() received the shared autospec'd Brain instance; clear
+        # calls and return values left by the previous test, then restore
+        # the defaults.
+        brain = orch.brain
+        brain.reset_mock(return_value=True, side_effect=True)
+
+        # Mock persona system
+        mock_persona = copy.copy(_DEFAULT_PERSONA)
+        brain.personas.get_active.return_value = mock_persona
+        brain.personas.get_active_name.return_value = "witty"
+        brain.personas.list_all.return_value = [
+            mock_persona,
+            copy.copy(_PROFESSIONAL_PERSONA),
+        ]
+
+        # Mock TTS
+        orch.tts.reset_mock(return_value=True, side_effect=True)
+        orch.tts.get_voice.return_value = "en-GB-RyanNeural"
 
     def test_empty_command(self):
         response = self.orchestrator.process_command("")
@@ -71,30 +129,29 @@ class TestOrchestrator(unittest.TestCase):
 
     def test_shell_command_routing(self):
         """'dir' should route directly to shell execution."""
-        if os.name == 'nt':
-            response = self.orchestrator.process_command("dir")
-            # Should contain some output (not route to LLM)
-            self.assertTrue(len(response) > 0)
+        # Shell commands go through the mocked backend, so no real process
+        # is spawned and the test runs on every platform.
+        response = self.orchestrator.process_command("dir")
+        self.assertEqual(self.mock_backend.run_shell.call_count, 1)
+        self.assertEqual(self.mock_backend.run_shell.call_args.kwargs["command"], "dir")
+        self.orchestrator.brain.generate_response.assert_not_called()
+        self.assertIn("hello", response)
 
     def test_llm_routing(self):
         """Natural language should route to Brain."""
-        self.orchestrator.brain.generate_response = MagicMock(
-            return_value="The sky is blue because of Rayleigh scattering."
-        )
+        self.orchestrator.brain.generate_response.return_value = "The sky is blue because of Rayleigh scattering."
         response = self.orchestrator.process_command("Explain why the sky is blue")
         self.orchestrator.brain.generate_response.assert_called_once()
         self.assertIn("Rayleigh scattering", response)
 
     def test_llm_with_shell_tags(self):
         """LLM response with [SHELL] tags should trigger execution."""
-        self.orchestrator.brain.generate_response = MagicMock(
-            return_value="Here you go.\n[SHELL]echo hello[/SHELL]"
-        )
+        self.orchestrator.brain.generate_response.return_value = "Here you go.\n[SHELL]echo hello[/SHELL]"
         response = self.orchestrator.process_command("say hello in console")
         self.assertIn("Here you go", response)
 
     def test_llm_status_command(self):
-        self.orchestrator.brain.get_status = MagicMock(return_value={
+        self.orchestrator.brain.get_status.return_value = {
             "provider": "ollama",
             "model": "gemma:2b",
             "persona": "Witty JARVIS",
@@ -105,7 +162,7 @@ class TestOrchestrator(unittest.TestCase):
             "system_prompt_preview": "You are Jarvis",
             "memory_messages": 0,
             "health": "connected",
-        })
+        }
 
         response = self.orchestrator.process_command("llm status")
         self.assertIn("Brain Status", response)
@@ -113,63 +170,44 @@ class TestOrchestrator(unittest.TestCase):
         self.assertIn("connected", response)
         self.assertIn("Witty JARVIS", response)
 
-    def test_llm_set_temperature_command(self):
-        self.orchestrator.brain.set_option = MagicMock(
-            return_value=(True, "temperature set to 1.1.")
-        )
-        response = self.orchestrator.process_command("llm set temperature 1.1")
-        self.orchestrator.brain.set_option.assert_called_once_with("temperature", "1.1")
-        self.assertIn("temperature set to 1.1", response)
-
-    def test_llm_use_model_command(self):
-        self.orchestrator.brain.set_model = MagicMock(
-            return_value=(True, "Model set to 'llama3:latest'.")
+    def test_llm_control_commands(self):
+        """Each llm/memory command calls one Brain method and echoes its result."""
+        cases = (
+            ("llm set temperature 1.1", "set_option", ("temperature", "1.1"),
+             (True, "temperature set to 1.1."), "temperature set to 1.1"),
+            ("llm use llama3:latest", "set_model", ("llama3:latest",),
+             (True, "Model set to 'llama3:latest'."), "llama3:latest"),
+            ("llm provider gemini", "set_provider", ("gemini",),
+             (True, "Provider switched to 'gemini'."), "gemini"),
+            ("llm reset", "reset_settings", (),
+             "Brain settings, memory, and persona reset to defaults.", "reset"),
+            ("clear memory", "clear_memory", (),
+             "Conversation memory cleared.", "memory cleared"),
         )
-        response = self.orchestrator.process_command("llm use llama3:latest")
-        self.orchestrator.brain.set_model.assert_called_once_with("llama3:latest")
-        self.assertIn("llama3:latest", response)
+        for cmd, method, args, retval, expected in cases:
+            with self.subTest(cmd=cmd):
+                brain_method = getattr(self.orchestrator.brain, method)
+                brain_method.reset_mock()
+                brain_method.return_value = retval
+                response = self.orchestrator.process_command(cmd)
+                brain_method.assert_called_once_with(*args)
+                self.assertIn(expected, response)
 
     def test_llm_models_command(self):
-        self.orchestrator.brain.list_local_models = MagicMock(
-            return_value=(True, ["gemma:2b", "llama3:latest"])
-        )
+        self.orchestrator.brain.list_local_models.return_value = (True, ["gemma:2b", "llama3:latest"])
         response = self.orchestrator.process_command("llm models")
         self.assertIn("Available models", response)
         self.assertIn("gemma:2b", response)
 
-    def test_provider_switch_command(self):
-        self.orchestrator.brain.set_provider = MagicMock(
-            return_value=(True, "Provider switched to 'gemini'.")
-        )
-        response = self.orchestrator.process_command("llm provider gemini")
-        self.orchestrator.brain.set_provider.assert_called_once_with("gemini")
-        self.assertIn("gemini", response)
-
-    def test_llm_reset_command(self):
-        self.orchestrator.brain.reset_settings = MagicMock(
-            return_value="Brain settings, memory, and persona reset to defaults."
-        )
-        response = self.orchestrator.process_command("llm reset")
-        self.assertIn("reset", response.lower())
-
-    def test_clear_memory_command(self):
-        self.orchestrator.brain.clear_memory = MagicMock(
-            return_value="Conversation memory cleared."
-        )
-        response = self.orchestrator.process_command("clear memory")
-        self.assertIn("memory cleared", response.lower())
-
     def test_dangerous_command_blocked(self):
         """Dangerous commands from LLM should be blocked."""
-        self.orchestrator.brain.generate_response = MagicMock(
-            return_value="Formatting drive.\n[SHELL]format c:[/SHELL]"
-        )
+        self.orchestrator.brain.generate_response.return_value = "Formatting drive.\n[SHELL]format c:[/SHELL]"
         response = self.orchestrator.process_command("format my drive")
         self.assertIn("Blocked", response)
 
     def test_brain_alias_works(self):
         """'brain status' should work the same as 'llm status'."""
-        self.orchestrator.brain.get_status = MagicMock(return_value={
+        self.orchestrator.brain.get_status.return_value = {
             "provider": "gemini",
             "model": "gemini-2.0-flash",
             "persona": "Professional",
@@ -180,7 +218,7 @@ class TestOrchestrator(unittest.TestCase):
             "system_prompt_preview": "You are Jarvis",
             "memory_messages": 5,
             "health": "connected",
-        })
+        }
         response = self.orchestrator.process_command("brain status")
         self.assertIn("Brain Status", response)
 
@@ -195,10 +233,8 @@ class TestOrchestrator(unittest.TestCase):
 
     def test_persona_set_command(self):
         """'persona set professional' should switch persona."""
-        self.orchestrator.brain.set_persona = MagicMock(
-            return_value=(True, "Persona switched to 'Professional'.", "en-US-GuyNeural")
-        )
-        prof = _make_mock_persona("professional", "Professional", "No-nonsense", "en-US-GuyNeural")
+        self.orchestrator.brain.set_persona.return_value = (True, "Persona switched to 'Professional'.", "en-US-GuyNeural")
+        prof = copy.copy(_PROFESSIONAL_PERSONA)
         self.orchestrator.brain.personas.get_active.return_value = prof
 
         response = self.orchestrator.process_command("persona set professional")
@@ -238,23 +274,21 @@ class TestOrchestrator(unittest.TestCase):
         self.assertIn("Confirmation Mode: OFF", response)
         self.assertIn("WSL Sandbox Mode:  OFF", response)
 
-    def test_shell_confirmation_toggle(self):
-        response = self.orchestrator.process_command("shell confirmation on")
-        self.assertTrue(self.orchestrator.confirmation_mode)
-        self.assertIn("turned ON", response)
-        
-        response = self.orchestrator.process_command("shell confirmation off")
-        self.assertFalse(self.orchestrator.confirmation_mode)
-        self.assertIn("turned OFF", response)
-
-    def test_shell_wsl_toggle(self):
-        response = self.orchestrator.process_command("shell wsl on")
-        self.assertTrue(self.orchestrator.wsl_mode)
-        self.assertIn("turned ON", response)
-        
-        response = self.orchestrator.process_command("shell wsl off")
-        self.assertFalse(self.orchestrator.wsl_mode)
-        self.assertIn("turned OFF", response)
+    def test_shell_toggles(self):
+        """Each on/off command flips its flag independently of the others."""
+        cases = (
+            ("shell confirmation on", "confirmation_mode", True, "turned ON"),
+            ("shell confirmation off", "confirmation_mode", False, "turned OFF"),
+            ("shell wsl on", "wsl_mode", True, "turned ON"),
+            ("shell wsl off", "wsl_mode", False, "turned OFF"),
+        )
+        for cmd, attr, expected_flag, expected_text in cases:
+            with self.subTest(cmd=cmd):
+                # Start from the opposite state so each row proves its own flip
+                setattr(self.orchestrator, attr, not expected_flag)
+                response = self.orchestrator.process_command(cmd)
+                self.assertIs(getattr(self.orchestrator, attr), expected_flag)
+                self.assertIn(expected_text, response)
 
     def test_shell_confirmation_logic(self):
         """If confirmation mode is ON, command should wait for callback."""
@@ -279,5 +313,6 @@ class TestOrchestrator(unittest.TestCase):
 
 
 if __name__ == '__main__':
-    unittest.main()
+    # Run through pytest so markers, conftest and xdist (-n) apply
+    sys.exit(pytest.main([__file__, *sys.argv[1:]]))
 
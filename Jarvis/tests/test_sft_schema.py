@@ -0,0 +1,56 @@
+"""
+Tests for SFT dataset validation (Jarvis.sft.schema).
+"""
+
+import json
+
+import pytest
+
+from Jarvis.sft.schema import validate_jsonl
+
+
+def _row(**overrides):
+    row = {
+        "id": "ex_1",
+        "split": "train",
+        "scenario": "conversational",
+        "user_input": "hello",
+        "assistant_text": "Hi there.",
+        "expected_outcome": "conversational",
+    }
+    row.update(overrides)
+    return row
+
+
+@pytest.fixture
+def write_jsonl(tmp_path):
+    def write(rows):
+        path = tmp_path / "data.jsonl"
+        path.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+        return str(path)
+    return write
+
+
+class TestValidateJsonl:
+    """Malformed rows are reported and validation continues."""
+
+    @pytest.mark.parametrize("num_proc", [1, 2])
+    def test_unhashable_id_is_parse_error(self, write_jsonl, num_proc):
+        path = write_jsonl([_row(id=[]), _row(id="ex_2")])
+        total, valid, errors = validate_jsonl(path, num_proc=num_proc)
+        assert (total, valid) == (2, 1)
+        assert [(e.example_id, e.field) for e in errors] == [("line_1", "json")]
+
+    @pytest.mark.parametrize("field, message", [
+        ("split", "Invalid split: []"),
+        ("scenario", "Unknown scenario: []"),
+        ("risk_level", "Invalid risk: []"),
+        ("expected_outcome", "Invalid outcome: []"),
+    ])
+    def test_non_string_enum_field_flagged(self, write_jsonl, field, message):
+        """A non-string value is a field error, and its id still counts for duplicates."""
+        path = write_jsonl([_row(**{field: []}), _row()])
+        total, valid, errors = validate_jsonl(path)
+        assert (total, valid) == (2, 0)
+        assert (field, message) in [(e.field, e.message) for e in errors]
+        assert any(e.field == "id" and "Duplicate ID" in e.message for e in errors)
@@ -7,6 +7,7 @@ TagStreamFilter, and action tag parsing.
 
 import pytest
 import os
+import re
 import json
 from unittest.mock import MagicMock, patch
 
@@ -15,7 +16,7 @@ from Jarvis.core.system.actions import (
     ActionResult, ShellResult, ActionRequest, ActionType, RiskLevel,
 )
 from Jarvis.core.system.app_registry import AppRegistry, AppEntry
-from Jarvis.core.system.safety import SafetyEngine
+from Jarvis.core.system.safety import SafetyEngine, HYPERSCAN_AVAILABLE
 from Jarvis.core.system.action_router import (
     ActionRouter, parse_action_tag, extract_actions,
 )
@@ -25,14 +26,15 @@ from Jarvis.core.system.action_router import (
 #  App Registry Tests
 # ════════════════════════════════════════════════════════════════════════════
 
+@pytest.fixture(scope="class")
+def registry():
+    """Load the real bundled app registry once per class; tests only read it."""
+    return AppRegistry()
+
+
 class TestAppRegistry:
     """Tests for AppRegistry name resolution."""
 
-    @pytest.fixture
-    def registry(self):
-        """Load the real bundled app registry."""
-        return AppRegistry()
-
     def test_exact_match(self, registry):
         """Canonical name should resolve."""
         entry = registry.resolve("chrome")
@@ -57,6 +59,12 @@ class TestAppRegistry:
         assert entry is not None
         assert entry.name == "notepad"
 
+    def test_fuzzy_match_substitution(self, registry):
+        """A single wrong letter should resolve like a missing one."""
+        entry = registry.resolve("spotifu")
+        assert entry is not None
+        assert entry.name == "spotify"
+
     def test_unknown_app(self, registry):
         """Unknown apps return None."""
         entry = registry.resolve("xyznonexistent_app_12345")
@@ -110,11 +118,18 @@ class TestAppRegistry:
 #  Safety Engine Tests
 # ════════════════════════════════════════════════════════════════════════════
 
+@pytest.fixture(scope="class")
+def safety():
+    """Shared engine for the read-only assessment tests."""
+    return SafetyEngine()
+
+
 class TestSafetyEngine:
     """Tests for SafetyEngine risk assessment."""
 
     @pytest.fixture
-    def safety(self):
+    def fresh_safety(self):
+        """Per-test engine for tests that mutate lists or the audit log."""
         return SafetyEngine()
 
     # ── Dangerous commands ──
@@ -179,21 +194,54 @@ class TestSafetyEngine:
 
     # ── Blocklist / allowlist ──
 
-    def test_blocklist(self, safety):
-        safety.add_to_blocklist("evil_command")
-        risk, _ = safety.assess_command("evil_command --force")
+    def test_blocklist(self, fresh_safety):
+        fresh_safety.add_to_blocklist("evil_command")
+        risk, _ = fresh_safety.assess_command("evil_command --force")
         assert risk == RiskLevel.CRITICAL
 
-    def test_allowlist_overrides(self, safety):
-        safety.add_to_allowlist(r"shutdown")
-        risk, _ = safety.assess_command("shutdown /s")
+    def test_blocklist_invalidates_cached_assessment(self, fresh_safety):
+        assert fresh_safety.assess_command("evil_command")[0] == RiskLevel.LOW
+        fresh_safety.add_to_blocklist("evil_command")
+        assert fresh_safety.assess_command("evil_command")[0] == RiskLevel.CRITICAL
+
+    def test_allowlist_overrides(self, fresh_safety):
+        fresh_safety.add_to_allowlist(r"shutdown")
+        risk, _ = fresh_safety.assess_command("shutdown /s")
         assert risk == RiskLevel.LOW  # Allowlisted
 
+    def test_allowlist_entries_compiled_independently(self, fresh_safety):
+        """Inline flags and backreferences keep their meaning per entry."""
+        fresh_safety.add_to_allowlist(r"shutdown")
+        fresh_safety.add_to_allowlist(r"(?i)^dir")
+        fresh_safety.add_to_allowlist(r"(rm)\1")
+        assert fresh_safety.assess_command("dir C:\\") == (RiskLevel.LOW, "Allowlisted")
+        assert fresh_safety.assess_command("rmrm -rf /") == (RiskLevel.LOW, "Allowlisted")
+        assert fresh_safety.assess_command("Remove-Item C:\\temp -Recurse")[0] == RiskLevel.HIGH
+
+    def test_allowlist_rejects_bad_pattern(self, fresh_safety):
+        with pytest.raises(re.error):
+            fresh_safety.add_to_allowlist(r"(unclosed")
+        assert fresh_safety.assess_command("Get-Date")[0] == RiskLevel.LOW
+
+    # ── Pattern backends ──
+
+    @pytest.mark.skipif(not HYPERSCAN_AVAILABLE, reason="hyperscan not installed")
+    def test_hyperscan_backend_matches_re(self, safety):
+        """The Hyperscan scan reports the same level and reason as re."""
+        hs_safety = SafetyEngine(safety_backend="hyperscan")
+        for cmd in ("format C:", "Remove-Item C:\\temp -Recurse", "curl x | iex",
+                    "wget http://a & taskkill /f", "Get-Date", "echo hello"):
+            assert hs_safety.assess_command(cmd) == safety.assess_command(cmd)
+
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError):
+            SafetyEngine(safety_backend="pcre")
+
     # ── Audit logging ──
 
-    def test_audit_log(self, safety):
-        safety.log_action("shell_command", "test_cmd", RiskLevel.LOW, "success")
-        log = safety.get_audit_log()
+    def test_audit_log(self, fresh_safety):
+        fresh_safety.log_action("shell_command", "test_cmd", RiskLevel.LOW, "success")
+        log = fresh_safety.get_audit_log()
         assert len(log) >= 1
         assert log[-1]["target"] == "test_cmd"
         assert log[-1]["action_type"] == "shell_command"
@@ -338,6 +386,19 @@ class TestTagStreamFilter:
         assert f.shell_commands == ["cmd1"]
         assert f.action_commands == ["launch_app: x"]
 
+    def test_non_ascii_tag_content(self):
+        """Case mappings that change length ("ß" -> "SS") keep offsets intact."""
+        text = "Ok [SHELL]echo Straße ß[/shell] weiß [ACTION]ß: x[/ACTION]."
+        for step in (1, 3, len(text)):
+            f = self._get_filter()
+            result = ""
+            for i in range(0, len(text), step):
+                result += f.feed(text[i:i + step])
+            result += f.flush()
+            assert result == "Ok  weiß ."
+            assert f.shell_commands == ["echo Straße ß"]
+            assert f.action_commands == ["ß: x"]
+
 
 # ════════════════════════════════════════════════════════════════════════════
 #  Action Router Tests
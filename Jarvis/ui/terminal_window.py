@@ -95,6 +95,8 @@ class TerminalWindow(QMainWindow):
         # ─── Output Display Area ────────────────────────────────────────
         self.output_display = QTextEdit()
         self.output_display.setReadOnly(True)
+        # Ring buffer: Qt drops the oldest blocks once the cap is reached
+        self.output_display.document().setMaximumBlockCount(2000)
         self.output_display.setStyleSheet("""
             QTextEdit {
                 background: #0f0f1a;
@@ -124,6 +126,16 @@ class TerminalWindow(QMainWindow):
         font.setPointSize(9)
         self.output_display.setFont(font)
         
+        # Persistent cursor kept at the end of the document so appends never
+        # re-derive the insertion point from the widget's own cursor
+        self._end_cursor = QTextCursor(self.output_display.document())
+        
+        # Streamed chunks are buffered here and flushed in one edit
+        self._pending = []
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self.flush_output)
+        
         main_layout.addWidget(self.output_display, 1)
         
         # ─── Info Footer ────────────────────────────────────────────────
@@ -193,6 +205,8 @@ class TerminalWindow(QMainWindow):
         if timestamp is None:
             timestamp = datetime.now().strftime("%H:%M:%S")
         
+        # Earlier streamed chunks must land before this command
+        self.flush_output()
         self.display_count += 1
         
         # Command line
@@ -224,20 +238,48 @@ class TerminalWindow(QMainWindow):
         if not output_text:
             return
         
+        # Earlier streamed chunks must land before this output
+        self.flush_output()
         color = "#ff6b6b" if is_error else "#e8e8e8"
         
-        # Split output into lines and display each
-        for line in output_text.split('\n'):
-            if line.strip():
-                self._append_text(f"  {line}\n", color=color)
-        
-        # Add divider after output
-        divider = get_divider(width=80)
-        self._append_text(f"\n{divider}\n\n", color="#1a2940")
+        # One edit block so the document relayouts once per call
+        self._end_cursor.beginEditBlock()
+        try:
+            # Split output into lines and display each
+            for line in output_text.split('\n'):
+                if line.strip():
+                    self._append_text(f"  {line}\n", color=color)
+            
+            # Add divider after output
+            divider = get_divider(width=80)
+            self._append_text(f"\n{divider}\n\n", color="#1a2940")
+        finally:
+            self._end_cursor.endEditBlock()
         
         # Auto-scroll to bottom
         self._scroll_to_bottom()
     
+    def queue_output(self, chunk):
+        """
+        Buffer a streamed output chunk for the next coalesced flush.
+        
+        Args:
+            chunk: Partial output text; flushed together with other chunks
+                   that arrive within one frame (~16 ms)
+        """
+        self._pending.append(chunk)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start(16)
+    
+    def flush_output(self):
+        """Write all buffered chunks to the display in a single append."""
+        self._flush_timer.stop()
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending.clear()
+        self.append_output(text)
+    
     def update_status(self, status_text, status_type="normal"):
         """
         Update the status label.
@@ -285,7 +327,7 @@ class TerminalWindow(QMainWindow):
             color: Hex color code (e.g., "#00ff9f")
             bold: Whether to make text bold
         """
-        cursor = self.output_display.textCursor()
+        cursor = self._end_cursor
         cursor.movePosition(QTextCursor.MoveOperation.End)
         
         # Create text format
@@ -295,19 +337,17 @@ class TerminalWindow(QMainWindow):
         if bold:
             fmt.setFontWeight(700)
         
-        cursor.setCharFormat(fmt)
-        cursor.insertText(text)
-        
-        self.output_display.setTextCursor(cursor)
+        cursor.insertText(text, fmt)
     
     def _scroll_to_bottom(self):
         """Scroll the output display to the bottom."""
-        cursor = self.output_display.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        self.output_display.setTextCursor(cursor)
+        scrollbar = self.output_display.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
     
     def clear_output(self):
         """Clear all output and reset display."""
+        self._flush_timer.stop()
+        self._pending.clear()
         self.output_display.clear()
         self.display_count = 0
         self.command_history.clear()
@@ -190,6 +190,7 @@ class MainWindow(QMainWindow):
         # Response log (read-only)
         self.response_log = QTextEdit()
         self.response_log.setReadOnly(True)
+        self.response_log.document().setMaximumBlockCount(1000)  # Keep the last 1000 lines
         self.response_log.setFixedHeight(140)
         self.response_log.setFont(QFont("Consolas", 9))
         self.response_log.setStyleSheet("""
@@ -466,11 +467,13 @@ class MainWindow(QMainWindow):
         self.response_log.ensureCursorVisible()
 
         if hasattr(self, '_terminal_window') and self._terminal_window is not None:
-            self._terminal_window.append_output(text)
+            self._terminal_window.queue_output(text)
 
     def on_stream_end(self):
         """Finalise a streaming response block."""
         self._streaming = False
+        if hasattr(self, '_terminal_window') and self._terminal_window is not None:
+            self._terminal_window.flush_output()
 
     # ── Window State ────────────────────────────────────────────────────
 